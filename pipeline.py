@@ -16,24 +16,30 @@ Usage:
 """
 
 import argparse
+import asyncio
+import functools
 import logging
+import os
 import sys
 import time
 from pathlib import Path
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
 # Import our modules
 from src.utils import (
     setup_logging, load_campaign_brief, create_output_structure, 
-    generate_execution_report, calculate_estimated_cost
+    generate_execution_report, calculate_estimated_cost, CampaignBriefView,
+    BoundedBatcher
 )
 from src.asset_manager import AssetManager
 from src.prompt_engineer import PromptEngineer
 from src.image_generator import ImageGenerator
 from src.creative_composer import CreativeComposer
-from src.compliance_checker import ComplianceChecker
+
+
+# Bound on items buffered between async generation stages
+PIPELINE_QUEUE_SIZE = 4
 
 
 def parse_arguments():
@@ -76,17 +82,44 @@ For more information, see README.md
         action="store_true",
         help="Generate images in parallel (faster, experimental)"
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Maximum concurrent image generations in --parallel mode (default: 8)"
+    )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Generate prompts through the OpenAI Batch API (~50%% cheaper, queued for up to 24h)"
+    )
+    parser.add_argument(
+        "--deep-validate",
+        action="store_true",
+        help="Check existing assets for file corruption, not just dimensions"
+    )
+    parser.add_argument(
+        "--compliance-batch-size",
+        type=int,
+        default=16,
+        help="Maximum variations per compliance check batch (default: 16)"
+    )
+    parser.add_argument(
+        "--compliance-max-wait-ms",
+        type=float,
+        default=500,
+        help="Flush a pending compliance batch after this many ms (default: 500)"
+    )
     return parser.parse_args()
 
 
-def generate_single_image(product, campaign_brief, prompt_engineer, image_generator, asset_manager):
+def generate_single_image(product, prompt, image_generator, asset_manager):
     """
     Generate a single product image.
     
     Args:
         product: Product dictionary
-        campaign_brief: Full campaign brief
-        prompt_engineer: PromptEngineer instance
+        prompt: Precomputed image generation prompt
         image_generator: ImageGenerator instance
         asset_manager: AssetManager instance
         
@@ -97,9 +130,6 @@ def generate_single_image(product, campaign_brief, prompt_engineer, image_genera
     product_name = product.get("name", product_id)
     
     try:
-        # Generate optimized prompt using GPT-4
-        prompt = prompt_engineer.create_image_prompt(campaign_brief, product)
-        
         # Generate image using Flux
         image_url = image_generator.generate_with_flux(prompt, image_size="16x9")
         
@@ -113,6 +143,93 @@ def generate_single_image(product, campaign_brief, prompt_engineer, image_genera
         return (product_id, None)
 
 
+async def generate_all(missing_products, prompts, image_generator, asset_manager,
+                       max_concurrency, on_complete=None):
+    """
+    Generate images for all missing products with a staged async pipeline.
+    
+    Work flows through three stages connected by bounded queues:
+      1. producer  - feeds (product, prompt) pairs
+      2. submitters - up to max_concurrency concurrent Flux generations
+      3. downloader - starts each download as a background task, so disk and
+         CDN I/O overlap the next Flux request
+    
+    Args:
+        missing_products: List of product dictionaries to generate
+        prompts: Dictionary mapping product IDs to prompts
+        image_generator: ImageGenerator instance
+        asset_manager: AssetManager instance
+        max_concurrency: Maximum number of in-flight generations
+        on_complete: Optional callback(product_id, saved_path) invoked as soon
+            as each product's image is saved
+        
+    Returns:
+        List of (product_id, saved_path) tuples in product order
+        (saved_path is None on failure)
+    """
+    num_submitters = max(1, min(max_concurrency, len(missing_products)))
+    prompt_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    download_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    results = {}
+    
+    def record(product_id, saved_path, pbar):
+        results[product_id] = saved_path
+        pbar.update(1)
+        if saved_path and on_complete:
+            on_complete(product_id, saved_path)
+    
+    async def produce():
+        for product in missing_products:
+            await prompt_queue.put((product, prompts[product.get("id")]))
+        for _ in range(num_submitters):
+            await prompt_queue.put(None)
+    
+    async def submit(pbar):
+        while True:
+            item = await prompt_queue.get()
+            if item is None:
+                break
+            product, prompt = item
+            try:
+                # Generate image using Flux
+                image_url = await image_generator.generate_with_flux_async(prompt, image_size="16x9")
+                await download_queue.put((product, image_url))
+            except Exception as e:
+                logging.error(f"Failed to generate {product.get('name', product.get('id'))}: {e}")
+                record(product.get("id"), None, pbar)
+    
+    async def save(client, product, image_url, pbar):
+        product_id = product.get("id")
+        try:
+            saved_path = await asset_manager.save_generated_image_async(image_url, product_id, client)
+        except Exception as e:
+            logging.error(f"Failed to generate {product.get('name', product_id)}: {e}")
+            saved_path = None
+        record(product_id, saved_path, pbar)
+    
+    async def download(client, pbar):
+        tasks = []
+        while True:
+            item = await download_queue.get()
+            if item is None:
+                break
+            product, image_url = item
+            tasks.append(asyncio.create_task(save(client, product, image_url, pbar)))
+        await asyncio.gather(*tasks)
+    
+    with tqdm(total=len(missing_products), desc="🎨 Generating images") as pbar:
+        async with asset_manager.create_async_client() as client:
+            downloader = asyncio.create_task(download(client, pbar))
+            submitters = [asyncio.create_task(submit(pbar)) for _ in range(num_submitters)]
+            
+            await produce()
+            await asyncio.gather(*submitters)
+            await download_queue.put(None)
+            await downloader
+    
+    return [(p.get("id"), results.get(p.get("id"))) for p in missing_products]
+
+
 def main():
     """Main pipeline orchestration."""
     # Parse arguments
@@ -149,10 +266,11 @@ def main():
             raise FileNotFoundError(f"Campaign brief not found: {args.brief}")
         
         campaign_brief = load_campaign_brief(brief_path)
-        campaign_id = campaign_brief.get("campaign_id", "campaign")
-        campaign_name = campaign_brief.get("campaign_name", campaign_id)
-        products = campaign_brief.get("products", [])
-        campaign_message = campaign_brief.get("campaign_message", "")
+        brief = CampaignBriefView.from_brief(campaign_brief)
+        campaign_id = brief.campaign_id
+        campaign_name = brief.campaign_name
+        products = brief.products
+        campaign_message = brief.campaign_message
         
         logger.info(f"✓ Campaign: {campaign_name}")
         logger.info(f"✓ Products: {len(products)}")
@@ -166,15 +284,18 @@ def main():
         # =================================================================
         logger.info("\n🔧 Initializing components...")
         
-        asset_manager = AssetManager()
+        asset_manager = AssetManager(deep_validate=args.deep_validate)
         prompt_engineer = PromptEngineer()
         image_generator = ImageGenerator()
         
-        brand_config = campaign_brief.get("brand_config", {})
+        brand_config = brief.brand_config
         composer = CreativeComposer(brand_config)
         
         # Initialize compliance checker
         if not args.skip_compliance:
+            # Imported here so --skip-compliance runs don't load the checker
+            # (NumPy is only imported once text overlays or checks need it)
+            from src.compliance_checker import ComplianceChecker
             compliance_checker = ComplianceChecker(brand_config)
             
             # Check campaign message for legal compliance
@@ -203,50 +324,48 @@ def main():
         if missing_products and not args.skip_generation:
             logger.info("\n🎨 Generating missing product images...")
             
+            if args.batch_api:
+                # One queued Batch API request per product
+                prompts = prompt_engineer.create_image_prompts_batch_api(campaign_brief, missing_products)
+                gpt4_calls += len(missing_products)
+            else:
+                # Generate all prompts with as few batched GPT-4 calls as fit the model
+                prompts = prompt_engineer.create_image_prompts_batch(campaign_brief, missing_products)
+                gpt4_calls += len(prompt_engineer.plan_prompt_batches(campaign_brief, missing_products))
+            
             if args.parallel and len(missing_products) > 1:
                 # Parallel generation (experimental)
-                logger.info("   Using parallel processing...")
+                logger.info(f"   Using async processing (max {args.max_concurrency} concurrent)...")
                 
-                with ThreadPoolExecutor(max_workers=3) as executor:
-                    future_to_product = {
-                        executor.submit(
-                            generate_single_image,
-                            product,
-                            campaign_brief,
-                            prompt_engineer,
-                            image_generator,
-                            asset_manager
-                        ): product
-                        for product in missing_products
-                    }
-                    
-                    with tqdm(total=len(missing_products), desc="🎨 Generating images") as pbar:
-                        for future in as_completed(future_to_product):
-                            product = future_to_product[future]
-                            product_id, saved_path = future.result()
-                            
-                            if saved_path:
-                                existing_assets[product_id] = saved_path
-                                generated_count += 1
-                                gpt4_calls += 1
-                                flux_calls += 1
-                            
-                            pbar.update(1)
+                # Completed products land in existing_assets as soon as they're saved
+                results = asyncio.run(generate_all(
+                    missing_products,
+                    prompts,
+                    image_generator,
+                    asset_manager,
+                    args.max_concurrency,
+                    on_complete=existing_assets.__setitem__
+                ))
+                
+                for product_id, saved_path in results:
+                    if saved_path:
+                        generated_count += 1
+                        flux_calls += 1
             else:
                 # Sequential generation with progress bar
+                # Bind the per-run components once; each call only varies by product
+                generate = functools.partial(
+                    generate_single_image,
+                    image_generator=image_generator,
+                    asset_manager=asset_manager
+                )
+                
                 for product in tqdm(missing_products, desc="🎨 Generating images"):
-                    product_id, saved_path = generate_single_image(
-                        product,
-                        campaign_brief,
-                        prompt_engineer,
-                        image_generator,
-                        asset_manager
-                    )
+                    product_id, saved_path = generate(product, prompts[product.get("id")])
                     
                     if saved_path:
                         existing_assets[product_id] = saved_path
                         generated_count += 1
-                        gpt4_calls += 1
                         flux_calls += 1
             
             logger.info(f"\n✓ Generated {generated_count} new images")
@@ -260,18 +379,46 @@ def main():
         logger.info("\n🖼️  Creating aspect ratio variations...")
         
         output_base = create_output_structure(campaign_id, products)
-        aspect_ratios = campaign_brief.get("aspect_ratios", ["1x1", "9x16", "16x9"])
+        aspect_ratios = brief.aspect_ratios
         
         total_variations = 0
         
+        # Compliance checks run in bounded batches as variations are produced.
+        # Errors are handled here so a bad image never aborts the loop or the
+        # report; on failure the batch is re-checked one variation at a time
+        # so only the failing paths lose their reports.
+        def check_compliance_batch(paths):
+            logger.info(f"⚖️  Running compliance checks on {len(paths)} variations...")
+            try:
+                compliance_reports.extend(
+                    compliance_checker.run_full_compliance_check_batch(paths, campaign_message)
+                )
+                return
+            except Exception as e:
+                logger.warning(f"⚠️  Batched compliance check failed ({e}) - checking variations one by one")
+            
+            for path in paths:
+                try:
+                    compliance_reports.extend(
+                        compliance_checker.run_full_compliance_check_batch([path], campaign_message)
+                    )
+                except Exception as e:
+                    logger.error(f"✗ Compliance check failed for {path}: {e}")
+        
+        compliance_batcher = BoundedBatcher(
+            check_compliance_batch,
+            max_batch=args.compliance_batch_size,
+            max_wait_ms=args.compliance_max_wait_ms
+        )
+        product_name_by_id = {
+            p["id"]: p.get("name", p["id"]) for p in products if p.get("id")
+        }
+        
         for product_id, hero_image_path in tqdm(
             existing_assets.items(), 
             desc="🖼️  Creating variations"
         ):
-            product_name = next(
-                (p.get("name", product_id) for p in products if p.get("id") == product_id),
-                product_id
-            )
+            product_name = product_name_by_id.get(product_id, product_id)
             
             try:
                 variations = composer.create_variations(
@@ -284,19 +431,16 @@ def main():
                 
                 total_variations += len(variations)
                 
-                # Run compliance checks on generated variations
                 if not args.skip_compliance:
-                    for var_path in variations:
-                        compliance_report = compliance_checker.run_full_compliance_check(
-                            var_path,
-                            campaign_message
-                        )
-                        compliance_reports.append(compliance_report)
+                    compliance_batcher.extend(variations)
                 
             except Exception as e:
                 logger.error(f"✗ Failed to create variations for {product_name}: {e}")
                 continue
         
+        # Check any variations still waiting in a partial batch
+        compliance_batcher.flush()
+        
         # =================================================================
         # STEP 6: Summary & Reporting
         # =================================================================
@@ -340,13 +484,18 @@ def main():
         print("📁 Output Structure:")
         print(f"  {output_base}/")
         for product_id in existing_assets.keys():
-            product_folder = output_base / product_id
-            if product_folder.exists():
-                print(f"    ├── {product_id}/")
-                for ratio in aspect_ratios:
-                    ratio_file = product_folder / f"{ratio}.png"
-                    if ratio_file.exists():
-                        print(f"    │   ├── {ratio}.png")
+            # One directory listing per product instead of a stat per ratio file
+            try:
+                with os.scandir(output_base / product_id) as entries:
+                    file_names = {entry.name for entry in entries}
+            except FileNotFoundError:
+                continue
+            
+            print(f"    ├── {product_id}/")
+            for ratio in aspect_ratios:
+                file_name = f"{ratio}.{composer.output_format}"
+                if file_name in file_names:
+                    print(f"    │   ├── {file_name}")
         
         print(f"\n✅ Pipeline completed successfully!")
         print(f"🎉 Your campaign assets are ready in: {output_base}")
@@ -4,11 +4,25 @@ Asset Manager Module
 Handles checking existing assets, validating images, and managing file operations.
 """
 
+import asyncio
+import io
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 from PIL import Image
+from src.utils import HTTP2_AVAILABLE
+
+try:
+    import imagesize
+except ImportError:  # Optional speedup - fall back to PIL header parsing
+    imagesize = None
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +30,98 @@ logger = logging.getLogger(__name__)
 class AssetManager:
     """Manages campaign assets and checks for existing/missing images."""
     
-    def __init__(self, asset_folder: str = "input_assets"):
+    # Supported image extensions, in lookup preference order
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+    
+    # Chunk size for streaming downloads to disk
+    DOWNLOAD_CHUNK_SIZE = 1 << 20
+    
+    # Leading bytes of a download inspected for format and dimensions
+    HEADER_SNIFF_SIZE = 64 * 1024
+    
+    # Connection pool size for concurrent async downloads
+    DOWNLOAD_CONCURRENCY = 20
+    
+    def __init__(self, asset_folder: str = "input_assets", deep_validate: bool = False):
         """
         Initialize AssetManager.
         
         Args:
             asset_folder: Path to folder containing input assets
+            deep_validate: Also run PIL's integrity check on existing assets
+                (slower - catches truncated or corrupted files)
         """
         self.asset_folder = Path(asset_folder)
+        self.deep_validate = deep_validate
         self.asset_folder.mkdir(exist_ok=True)
+        self._index: Dict[str, Dict[str, Path]] = {}
+        self.refresh_index()
+        self.session = self._create_session()
         logger.info(f"AssetManager initialized with folder: {self.asset_folder}")
     
+    def _create_session(self) -> requests.Session:
+        """
+        Create a pooled HTTP session for image downloads.
+        
+        Keep-alive connections are reused across downloads (avoiding a TCP+TLS
+        handshake per image) and transient failures are retried with backoff.
+        """
+        session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"})
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # Generated images are already compressed - don't spend CPU on gzip
+        session.headers["Accept-Encoding"] = "identity"
+        return session
+    
+    def create_async_client(self) -> httpx.AsyncClient:
+        """
+        Create a pooled async HTTP client for concurrent image downloads.
+        
+        Connections (and their TLS sessions) are kept alive and shared by
+        every download made through the client; HTTP/2 is used when available.
+        """
+        return httpx.AsyncClient(
+            timeout=30,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=self.DOWNLOAD_CONCURRENCY,
+                max_keepalive_connections=self.DOWNLOAD_CONCURRENCY
+            ),
+            # Generated images are already compressed - don't spend CPU on gzip
+            headers={"Accept-Encoding": "identity"}
+        )
+    
+    def refresh_index(self) -> None:
+        """
+        Rebuild the in-memory index of image files in the asset folder.
+        
+        A single directory scan maps each file stem to its available
+        extensions, so asset lookups are dict probes instead of per-extension
+        stat calls.
+        """
+        index: Dict[str, Dict[str, Path]] = {}
+        with os.scandir(self.asset_folder) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                ext = ext.lower()
+                if ext in self.IMAGE_EXTENSIONS and entry.is_file():
+                    index.setdefault(stem, {})[ext] = Path(entry.path)
+        self._index = index
+    
+    def _find_candidates(self, product_id: str) -> List[Path]:
+        """Return indexed image paths for a product in extension preference order."""
+        by_ext = self._index.get(product_id)
+        if not by_ext:
+            return []
+        return [by_ext[ext] for ext in self.IMAGE_EXTENSIONS if ext in by_ext]
+    
     def check_existing_assets(self, products: List[Dict]) -> Tuple[Dict, List]:
         """
         Check which product assets exist and which need to be generated.
@@ -42,38 +137,53 @@ class AssetManager:
         
         logger.info(f"Checking assets for {len(products)} products...")
         
+        # Gather candidate files for every product up front
+        candidates_by_product = []
         for product in products:
             product_id = product.get('id')
             if not product_id:
                 logger.warning(f"Product missing 'id' field: {product}")
                 continue
-            
-            # Check for common image extensions
-            extensions = ['.png', '.jpg', '.jpeg', '.webp']
+            candidates_by_product.append((product, self._find_candidates(product_id)))
+        
+        # Validate all candidates concurrently (PIL releases the GIL during file I/O)
+        paths = [path for _, candidates in candidates_by_product for path in candidates]
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+                validity = dict(zip(paths, executor.map(self.validate_image, paths)))
+        else:
+            validity = {path: self.validate_image(path) for path in paths}
+        
+        for product, candidates in candidates_by_product:
+            product_id = product['id']
             found = False
             
-            for ext in extensions:
-                asset_path = self.asset_folder / f"{product_id}{ext}"
-                if asset_path.exists():
-                    if self.validate_image(asset_path):
-                        existing[product_id] = asset_path
-                        logger.info(f"✓ Found existing asset: {asset_path.name}")
-                        found = True
-                        break
-                    else:
-                        logger.warning(f"⚠ Invalid image file: {asset_path.name}")
+            for asset_path in candidates:
+                if validity[asset_path]:
+                    existing[product_id] = asset_path
+                    found = True
+                    break
+                else:
+                    logger.warning(f"⚠ Invalid image file: {asset_path.name}")
             
             if not found:
                 missing.append(product)
-                logger.info(f"✗ Missing asset for: {product_id}")
         
-        logger.info(f"Summary: {len(existing)} existing, {len(missing)} missing")
+        # One summary line instead of a log call per product
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✓ Found existing assets: %s", [p.name for p in existing.values()])
+            logger.debug("✗ Missing assets for: %s", [p['id'] for p in missing])
+        logger.info("Summary: %d existing, %d missing", len(existing), len(missing))
         return existing, missing
     
     def validate_image(self, image_path: Path) -> bool:
         """
         Validate that an image file is readable and has correct format.
         
+        Only the image header is read (format and dimensions); pixel data is
+        decoded later, when the image is actually used. With deep_validate
+        enabled, PIL's verify() additionally checks the file for corruption.
+        
         Args:
             image_path: Path to image file
             
@@ -81,22 +191,13 @@ class AssetManager:
             True if valid, False otherwise
         """
         try:
-            with Image.open(image_path) as img:
-                # Verify image can be loaded
-                img.verify()
+            width, height = self._read_size(image_path)
+            if not self._check_dimensions(width, height):
+                return False
             
-            # Re-open to check actual loading (verify closes the file)
-            with Image.open(image_path) as img:
-                width, height = img.size
-                
-                # Basic sanity checks
-                if width < 100 or height < 100:
-                    logger.warning(f"Image too small: {width}x{height}")
-                    return False
-                
-                if width > 10000 or height > 10000:
-                    logger.warning(f"Image too large: {width}x{height}")
-                    return False
+            if self.deep_validate:
+                with Image.open(image_path) as img:
+                    img.verify()
             
             return True
             
@@ -104,6 +205,30 @@ class AssetManager:
             logger.error(f"Image validation failed for {image_path}: {e}")
             return False
     
+    def _read_size(self, image_path: Path) -> Tuple[int, int]:
+        """Read image dimensions from the file header."""
+        if imagesize is not None:
+            # imagesize reads just the header bytes, without PIL's plugin machinery
+            width, height = imagesize.get(str(image_path))
+            if (width, height) != (-1, -1):
+                return width, height
+        
+        # Image.open() only parses the header - no pixel data is decoded
+        with Image.open(image_path) as img:
+            return img.size
+    
+    def _check_dimensions(self, width: int, height: int) -> bool:
+        """Basic sanity checks on image dimensions."""
+        if width < 100 or height < 100:
+            logger.warning(f"Image too small: {width}x{height}")
+            return False
+        
+        if width > 10000 or height > 10000:
+            logger.warning(f"Image too large: {width}x{height}")
+            return False
+        
+        return True
+    
     def save_generated_image(self, image_url: str, product_id: str) -> Path:
         """
         Download and save a generated image.
@@ -117,33 +242,171 @@ class AssetManager:
         """
         logger.info(f"Downloading image for {product_id} from {image_url[:50]}...")
         
+        # Save to input_assets folder
+        save_path = self.asset_folder / f"{product_id}.png"
+        
         try:
-            # Download image
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
-            
-            # Save to input_assets folder
-            save_path = self.asset_folder / f"{product_id}.png"
+            # Stream the download straight to disk instead of buffering it in memory
+            with self.session.get(image_url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                
+                # Validate dimensions from the in-memory header before writing
+                head = response.raw.read(self.HEADER_SNIFF_SIZE)
+                size = self._sniff_size(head)
+                self._reject_invalid_size(size)
+                
+                # Write to a temp file so a cut-off download never lands at save_path
+                tmp_path = self._temp_download_path(save_path)
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        f.write(head)
+                        shutil.copyfileobj(response.raw, f, self.DOWNLOAD_CHUNK_SIZE)
+                    os.replace(tmp_path, save_path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
             
-            with open(save_path, 'wb') as f:
-                f.write(response.content)
+            return self._finish_download(product_id, save_path, size)
+        
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to download image: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to save image: {e}")
+            raise
+    
+    async def save_generated_image_async(
+        self,
+        image_url: str,
+        product_id: str,
+        client: httpx.AsyncClient = None
+    ) -> Path:
+        """
+        Download and save a generated image without blocking the event loop.
+        
+        Args:
+            image_url: URL of generated image
+            product_id: Product identifier
+            client: Shared httpx.AsyncClient (a temporary one is created if omitted)
             
-            # Validate saved image
-            if self.validate_image(save_path):
-                logger.info(f"✓ Saved image: {save_path}")
-                return save_path
+        Returns:
+            Path to saved image
+        """
+        # Many downloads run concurrently here - progress is reported by the caller
+        logger.debug("Downloading image for %s from %s...", product_id, image_url[:50])
+        
+        # Save to input_assets folder
+        save_path = self.asset_folder / f"{product_id}.png"
+        
+        try:
+            if client is None:
+                async with httpx.AsyncClient(timeout=30) as own_client:
+                    size = await self._stream_to_file_async(own_client, image_url, save_path)
             else:
-                logger.error(f"✗ Downloaded image failed validation")
-                save_path.unlink()  # Delete invalid file
-                raise ValueError("Downloaded image failed validation")
+                size = await self._stream_to_file_async(client, image_url, save_path)
+            
+            # A read-back validation may be needed - keep file I/O off the event loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._finish_download, product_id, save_path, size
+            )
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to download image: {e}")
             raise
         except Exception as e:
             logger.error(f"Failed to save image: {e}")
             raise
     
+    async def _stream_to_file_async(
+        self,
+        client: httpx.AsyncClient,
+        image_url: str,
+        save_path: Path
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Stream a URL to disk chunk by chunk as the response arrives.
+        
+        Returns:
+            Image size sniffed from the first chunk, or None if it couldn't be read
+        """
+        async with client.stream("GET", image_url) as response:
+            response.raise_for_status()
+            chunks = response.aiter_bytes(self.DOWNLOAD_CHUNK_SIZE)
+            
+            # Validate dimensions from the in-memory header before writing
+            try:
+                head = await chunks.__anext__()
+            except StopAsyncIteration:
+                head = b""
+            size = self._sniff_size(head)
+            self._reject_invalid_size(size)
+            
+            # Write to a temp file so a cut-off download never lands at save_path
+            tmp_path = self._temp_download_path(save_path)
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(head)
+                    async for chunk in chunks:
+                        f.write(chunk)
+                os.replace(tmp_path, save_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        
+        return size
+    
+    @staticmethod
+    def _temp_download_path(save_path: Path) -> Path:
+        """
+        Temp file next to save_path for an in-progress download.
+        
+        The id() suffix keeps concurrent downloads in one process apart, and
+        the .tmp extension keeps partial files out of the asset index.
+        """
+        return save_path.with_name(f"{save_path.stem}.{os.getpid()}.{id(save_path)}.tmp")
+    
+    def _sniff_size(self, head: bytes) -> Optional[Tuple[int, int]]:
+        """Read image dimensions from the leading bytes of a download, if possible."""
+        try:
+            with Image.open(io.BytesIO(head)) as img:
+                return img.size
+        except Exception:
+            return None
+    
+    def _reject_invalid_size(self, size: Optional[Tuple[int, int]]) -> None:
+        """Raise if sniffed dimensions are known and out of bounds."""
+        if size is not None and not self._check_dimensions(*size):
+            logger.error(f"✗ Downloaded image failed validation")
+            raise ValueError("Downloaded image failed validation")
+    
+    def _finish_download(
+        self,
+        product_id: str,
+        save_path: Path,
+        size: Optional[Tuple[int, int]]
+    ) -> Path:
+        """
+        Register a freshly downloaded image, validating it from disk only if needed.
+        
+        Args:
+            product_id: Product identifier
+            save_path: Path the image was written to
+            size: Dimensions already validated from the in-memory header
+                (None if the header could not be parsed)
+            
+        Returns:
+            Path to saved image
+        """
+        # Header was parsed and checked before writing - no need to re-open the file
+        if size is not None or self.validate_image(save_path):
+            self._index.setdefault(product_id, {})['.png'] = save_path
+            logger.info(f"✓ Saved image: {save_path}")
+            return save_path
+        else:
+            logger.error(f"✗ Downloaded image failed validation")
+            save_path.unlink()  # Delete invalid file
+            raise ValueError("Downloaded image failed validation")
+    
     def get_asset_path(self, product_id: str) -> Path:
         """
         Get the path to a product's asset.
@@ -155,11 +418,9 @@ class AssetManager:
             Path to asset file
         """
         # Check for existing file with any extension
-        extensions = ['.png', '.jpg', '.jpeg', '.webp']
-        for ext in extensions:
-            path = self.asset_folder / f"{product_id}{ext}"
-            if path.exists():
-                return path
+        candidates = self._find_candidates(product_id)
+        if candidates:
+            return candidates[0]
         
         # Return default .png path even if doesn't exist
         return self.asset_folder / f"{product_id}.png"
@@ -5,13 +5,357 @@ Handles brand compliance checks and legal content validation.
 """
 
 import logging
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from PIL import Image
 import numpy as np
+from src.constants import Defaults
+
+try:
+    import ahocorasick
+except ImportError:  # Optional speedup - fall back to the regex scan
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# Bound on the (pixels x colors x 3) distance temporary, in bytes
+DISTANCE_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _min_sq_distances(pixels: np.ndarray, colors: np.ndarray) -> np.ndarray:
+    """
+    Smallest squared RGB distance from any pixel to each of the given colors.
+    
+    All colors are compared in one broadcast pass; pixels are processed in
+    row chunks so the temporary stays under DISTANCE_CHUNK_BYTES.
+    
+    Args:
+        pixels: (N, 3) uint8 array of RGB pixels
+        colors: (K, 3) integer array of 0-255 RGB colors
+        
+    Returns:
+        (K,) array of minimum squared distances
+    """
+    # Differences of 0-255 values fit in int16 - a quarter of the bytes of
+    # NumPy's default int64 promotion; only the squared sums need int32
+    colors = colors.astype(np.int16, copy=False)
+    
+    chunk_rows = max(1, DISTANCE_CHUNK_BYTES // (colors.shape[0] * 3 * 2))
+    min_d2 = np.full(colors.shape[0], np.iinfo(np.int32).max, dtype=np.int32)
+    for start in range(0, pixels.shape[0], chunk_rows):
+        diff = np.subtract(
+            pixels[start:start + chunk_rows, None, :], colors[None, :, :], dtype=np.int16
+        )
+        # einsum squares and sums in one pass, without a squared temporary
+        d2 = np.einsum('ijk,ijk->ij', diff, diff, dtype=np.int32)
+        np.minimum(min_d2, d2.min(axis=0), out=min_d2)
+    
+    return min_d2
+
+
+def _min_sq_distances_per_image(samples: List[np.ndarray], colors: np.ndarray) -> np.ndarray:
+    """
+    Per-image smallest squared RGB distance to each color, for many images.
+    
+    Pixels of several images are stacked and compared with all colors in one
+    broadcast, then reduced per image; images are grouped so the temporaries
+    stay around DISTANCE_CHUNK_BYTES.
+    
+    Args:
+        samples: (H, W, 3) uint8 arrays, one per image
+        colors: (K, 3) integer array of 0-255 RGB colors
+        
+    Returns:
+        (N, K) array of minimum squared distances
+    """
+    colors = colors.astype(np.int16, copy=False)
+    row_cap = max(1, DISTANCE_CHUNK_BYTES // (colors.shape[0] * 3 * 2))
+    
+    results = []
+    start = 0
+    while start < len(samples):
+        # Take images until the stacked pixel count reaches the cap
+        end, rows = start, 0
+        while end < len(samples) and (end == start or rows + samples[end].size // 3 <= row_cap):
+            rows += samples[end].size // 3
+            end += 1
+        
+        group = [s.reshape(-1, 3) for s in samples[start:end]]
+        offsets = np.cumsum([0] + [len(g) for g in group[:-1]])
+        diff = np.subtract(np.concatenate(group)[:, None, :], colors[None, :, :], dtype=np.int16)
+        d2 = np.einsum('ijk,ijk->ij', diff, diff, dtype=np.int32)
+        results.append(np.minimum.reduceat(d2, offsets, axis=0))
+        start = end
+    
+    return np.concatenate(results)
+
+
+@lru_cache(maxsize=256)
+def _hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
+    """Parse a hex color like "#FF00AA" into an RGB tuple."""
+    h = hex_color.lstrip('#')
+    return (int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16))
+
+
+@lru_cache(maxsize=64)
+def _color_targets(hex_colors: Tuple[str, ...]) -> np.ndarray:
+    """Build a read-only (K, 3) int16 array of RGB colors from hex strings."""
+    targets = np.array([_hex_to_rgb(c) for c in hex_colors], dtype=np.int16)
+    targets.setflags(write=False)
+    return targets
+
+
+# Normalized cross-correlation score above which the logo counts as present
+# (the placed logo is pixel-identical to the template, so true hits score ~1)
+LOGO_MATCH_THRESHOLD = 0.8
+
+# Coarse-to-fine logo search: match at 1/LOGO_PYRAMID_FACTOR scale first and
+# only refine around coarse peaks scoring at least LOGO_COARSE_THRESHOLD
+LOGO_PYRAMID_FACTOR = 4
+LOGO_COARSE_THRESHOLD = 0.5
+LOGO_COARSE_MAX_PEAKS = 5
+LOGO_COARSE_SEPARATION = 2
+LOGO_REFINE_MARGIN = 16
+
+# Color presence checks run on an image downsampled by this factor per side
+COLOR_CHECK_DOWNSAMPLE = 4
+
+
+def _next_fast_len(n: int) -> int:
+    """Smallest 2^a * 3^b * 5^c >= n (an efficient FFT length)."""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            p235 = p35
+            while p235 < n:
+                p235 *= 2
+            best = min(best, p235)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+class _LogoTemplate:
+    """Grayscale logo template prepared for masked FFT cross-correlation."""
+    
+    __slots__ = ("size", "kernel", "mask", "count", "norm", "coarse", "_spectra")
+    
+    def __init__(self, logo: Image.Image):
+        """
+        Prepare a template from an RGBA logo, sized as it is placed on creatives.
+        
+        Args:
+            logo: RGBA logo image at its final placed size
+        """
+        self.size = logo.size
+        gray = np.asarray(logo.convert('L'), dtype=np.float64)
+        mask = np.asarray(logo.getchannel('A')) > 127
+        
+        # Zero-mean over the opaque pixels, zero outside them: the correlation
+        # numerator then needs no per-window image mean
+        self.mask = mask.astype(np.float64)
+        self.count = float(mask.sum())
+        mean = gray[mask].mean() if self.count else 0.0
+        self.kernel = np.where(mask, gray - mean, 0.0)
+        self.norm = float(np.sqrt((self.kernel ** 2).sum()))
+        self.coarse: Optional["_LogoTemplate"] = None
+        self._spectra: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+    
+    def spectra(self, fft_shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """FFTs of the flipped kernel and mask for a padded size, cached per size."""
+        cached = self._spectra.get(fft_shape)
+        if cached is None:
+            cached = (
+                np.fft.rfft2(self.kernel[::-1, ::-1], fft_shape),
+                np.fft.rfft2(self.mask[::-1, ::-1], fft_shape)
+            )
+            self._spectra[fft_shape] = cached
+        return cached
+    
+    def match(self, image: np.ndarray) -> np.ndarray:
+        """
+        Masked normalized cross-correlation of the template over an image.
+        
+        Args:
+            image: 2-D grayscale image, at least as large as the template
+            
+        Returns:
+            NCC score in [-1, 1] for every valid template position
+        """
+        th, tw = self.kernel.shape
+        ih, iw = image.shape
+        fft_shape = (_next_fast_len(ih + th - 1), _next_fast_len(iw + tw - 1))
+        f_kernel, f_mask = self.spectra(fft_shape)
+        
+        # Centering the image keeps the windowed sums well conditioned
+        image = image - image.mean()
+        f_image = np.fft.rfft2(image, fft_shape)
+        f_image_sq = np.fft.rfft2(image * image, fft_shape)
+        
+        valid = (slice(th - 1, ih), slice(tw - 1, iw))
+        numerator = np.fft.irfft2(f_image * f_kernel, fft_shape)[valid]
+        window_sum = np.fft.irfft2(f_image * f_mask, fft_shape)[valid]
+        window_sq_sum = np.fft.irfft2(f_image_sq * f_mask, fft_shape)[valid]
+        
+        # Windows with (near) flat content can't match a textured template
+        variance = window_sq_sum - window_sum * window_sum / self.count
+        flat = variance < self.count
+        denominator = self.norm * np.sqrt(np.maximum(variance, 0.0))
+        ncc = numerator / np.where(flat, 1.0, denominator)
+        ncc[flat] = 0.0
+        return np.clip(ncc, -1.0, 1.0)
+    
+    def best_score(self, image: Image.Image) -> float:
+        """
+        Best NCC score of the template over an image, searched coarse-to-fine.
+        
+        The search runs on a downsampled image first. If no position scores
+        LOGO_COARSE_THRESHOLD there, the full-resolution pass is skipped;
+        otherwise only small windows around the best coarse peaks are matched
+        at full resolution, strongest first, stopping at the first one that
+        clears LOGO_MATCH_THRESHOLD.
+        
+        Args:
+            image: Grayscale ('L') image
+            
+        Returns:
+            Best score found, in [-1, 1]
+        """
+        th, tw = self.kernel.shape
+        factor = LOGO_PYRAMID_FACTOR
+        
+        if self.coarse is None or image.width // factor < self.coarse.size[0] * 2:
+            return float(self.match(np.asarray(image, dtype=np.float64)).max())
+        
+        coarse_scores = self.coarse.match(
+            np.asarray(image.reduce(factor), dtype=np.float64)
+        )
+        if coarse_scores.max() < LOGO_COARSE_THRESHOLD:
+            return float(coarse_scores.max())
+        
+        # Refine around the strongest, mutually distinct coarse peaks
+        full = np.asarray(image, dtype=np.float64)
+        # (peaks must be LOGO_COARSE_SEPARATION apart; a logo placed off the
+        # coarse grid can score below a look-alike position nearby)
+        sep = LOGO_COARSE_SEPARATION
+        margin = factor + LOGO_REFINE_MARGIN
+        best = -1.0
+        for _ in range(LOGO_COARSE_MAX_PEAKS):
+            cy, cx = np.unravel_index(np.argmax(coarse_scores), coarse_scores.shape)
+            if coarse_scores[cy, cx] < LOGO_COARSE_THRESHOLD:
+                break
+            coarse_scores[max(cy - sep, 0):cy + sep + 1, max(cx - sep, 0):cx + sep + 1] = -1.0
+            
+            y0 = max(cy * factor - margin, 0)
+            x0 = max(cx * factor - margin, 0)
+            window = full[y0:cy * factor + margin + th, x0:cx * factor + margin + tw]
+            if window.shape[0] >= th and window.shape[1] >= tw:
+                best = max(best, float(self.match(window).max()))
+                if best > LOGO_MATCH_THRESHOLD:
+                    break  # Verdict is settled - skip refining weaker peaks
+        
+        return best
+
+
+# WCAG sRGB -> linear transfer function for every 8-bit channel value
+_srgb = np.arange(256) / 255.0
+_SRGB_TO_LINEAR = np.where(_srgb <= 0.03928, _srgb / 12.92, ((_srgb + 0.055) / 1.055) ** 2.4)
+_WCAG_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+del _srgb
+
+
+def _relative_luminance(colors: np.ndarray) -> np.ndarray:
+    """
+    WCAG relative luminance of sRGB colors.
+    
+    Args:
+        colors: (..., 3) or (..., 4) array of 0-255 integer RGB(A) values;
+            alpha is ignored
+        
+    Returns:
+        Array of luminances with the leading shape of colors
+    """
+    return _SRGB_TO_LINEAR[np.asarray(colors, dtype=np.intp)[..., :3]] @ _WCAG_WEIGHTS
+
+
+def _contrast_ratio(text_colors: np.ndarray, bg_colors: np.ndarray) -> np.ndarray:
+    """WCAG contrast ratio between text and background colors (lighter over darker)."""
+    l1 = _relative_luminance(text_colors)
+    l2 = _relative_luminance(bg_colors)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+# A legal content violation (reported as a dict via _asdict())
+_Violation = namedtuple('_Violation', 'term reason severity')
+_PROHIBITED_REASON = "Prohibited marketing claim"
+_SEVERITY_HIGH = "high"
+
+
+# A word for prohibited-term lookups ("#" kept so "#1" is a single token)
+_TOKEN_RE = re.compile(r"[\w#]+")
+
+
+def _split_terms(terms: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Split terms into single tokens and multi-token phrases.
+    
+    Args:
+        terms: Terms to split
+        
+    Returns:
+        Tuple of (lowercased single-token term -> term, list of phrases)
+    """
+    singles = {t.lower(): t for t in terms if _TOKEN_RE.fullmatch(t)}
+    phrases = [t for t in terms if not _TOKEN_RE.fullmatch(t)]
+    return singles, phrases
+
+
+def _compile_term_pattern(terms: List[str]) -> re.Pattern:
+    """
+    Compile a list of terms into one case-insensitive alternation.
+    
+    Longer terms are tried first so "guaranteed" wins over "guarantee", and
+    whitespace inside a term matches any run of whitespace. Terms must not be
+    part of a larger word ("free" does not match "freedom").
+    
+    Args:
+        terms: Terms to match
+        
+    Returns:
+        Compiled pattern
+    """
+    alternatives = [
+        r'\s+'.join(re.escape(part) for part in term.split())
+        for term in sorted(terms, key=len, reverse=True)
+    ]
+    return re.compile(r'(?<!\w)(?:' + '|'.join(alternatives) + r')(?!\w)', re.IGNORECASE)
+
+
+def _build_term_automaton(terms: List[str]):
+    """
+    Build an Aho-Corasick automaton over lowercased, whitespace-collapsed terms.
+    
+    Args:
+        terms: Terms to match
+        
+    Returns:
+        ahocorasick.Automaton whose values are (key length, original term)
+    """
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        key = " ".join(term.lower().split())
+        automaton.add_word(key, (len(key), term))
+    automaton.make_automaton()
+    return automaton
+
 
 class ComplianceChecker:
     """Validates brand compliance and legal content requirements."""
@@ -24,6 +368,21 @@ class ComplianceChecker:
         "secret", "banned", "illegal", "FDA approved"
     ]
     
+    # Single-token terms are looked up per word; terms spanning several tokens
+    # ("number one", "risk-free") are folded into one regex scan
+    _PROHIBITED_SINGLES, _prohibited_phrases = _split_terms(PROHIBITED_WORDS)
+    _PROHIBITED_PHRASE_RE = _compile_term_pattern(_prohibited_phrases)
+    del _prohibited_phrases
+    _PROHIBITED_BY_KEY = {" ".join(w.lower().split()): w for w in PROHIBITED_WORDS}
+    _PROHIBITED_AUTOMATON = _build_term_automaton(PROHIBITED_WORDS) if ahocorasick else None
+    
+    # One immutable violation record per term, built once
+    _VIOLATIONS = {
+        w: _Violation(w, _PROHIBITED_REASON, _SEVERITY_HIGH) for w in PROHIBITED_WORDS
+    }
+    
+    __slots__ = ("brand_config", "_brand_colors", "_logo_template_cache")
+    
     def __init__(self, brand_config: Dict = None):
         """
         Initialize ComplianceChecker.
@@ -32,6 +391,14 @@ class ComplianceChecker:
             brand_config: Dictionary with brand colors, logo path, etc.
         """
         self.brand_config = brand_config or {}
+        self._brand_colors = [
+            c for c in (
+                self.brand_config.get('primary_color'),
+                self.brand_config.get('secondary_color')
+            ) if c
+        ]
+        # (logo path, mtime) -> prepared logo template
+        self._logo_template_cache: Dict[Tuple[str, int], _LogoTemplate] = {}
         logger.info("ComplianceChecker initialized")
     
     def check_legal_content(self, text: str) -> Dict:
@@ -44,16 +411,11 @@ class ComplianceChecker:
         Returns:
             Dictionary with compliance status and violations
         """
-        violations = []
-        text_lower = text.lower()
-        
-        for word in self.PROHIBITED_WORDS:
-            if word in text_lower:
-                violations.append({
-                    "term": word,
-                    "reason": "Prohibited marketing claim",
-                    "severity": "high"
-                })
+        found = set(self._find_prohibited_terms(text))
+        violations = [
+            self._VIOLATIONS[word]._asdict()
+            for word in self.PROHIBITED_WORDS if word in found
+        ]
         
         compliant = len(violations) == 0
         
@@ -72,13 +434,77 @@ class ComplianceChecker:
         
         return result
     
-    def check_logo_presence(self, image_path: Path, logo_path: Path = None) -> Dict:
+    def _find_prohibited_terms(self, text: str) -> List[str]:
+        """
+        Find prohibited terms in text.
+        
+        Uses an Aho-Corasick automaton when pyahocorasick is installed.
+        Otherwise multi-token phrases are matched with one compiled regex and
+        the remaining words are looked up token by token in a hash table.
+        Both match whole words only and prefer the longest term at each
+        position ("risk-free" does not also report "free").
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Canonical prohibited terms found (may contain repeats)
+        """
+        if self._PROHIBITED_AUTOMATON is None:
+            found = [
+                self._PROHIBITED_BY_KEY[" ".join(m.group().lower().split())]
+                for m in self._PROHIBITED_PHRASE_RE.finditer(text)
+            ]
+            if found:
+                # Words inside a matched phrase don't count on their own
+                text = self._PROHIBITED_PHRASE_RE.sub(" ", text)
+            singles = self._PROHIBITED_SINGLES
+            found.extend(
+                singles[token] for token in _TOKEN_RE.findall(text.lower())
+                if token in singles
+            )
+            return found
+        
+        # Collapse whitespace so multi-word terms match across line breaks etc.
+        text = " ".join(text.lower().split())
+        
+        # The automaton reports every (possibly overlapping) substring match;
+        # keep whole-word ones, then take the leftmost-longest non-overlapping set
+        candidates = []
+        for end, (length, term) in self._PROHIBITED_AUTOMATON.iter(text):
+            start = end - length + 1
+            if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                continue
+            if end + 1 < len(text) and (text[end + 1].isalnum() or text[end + 1] == '_'):
+                continue
+            candidates.append((start, -length, term))
+        
+        found = []
+        last_end = -1
+        for start, neg_length, term in sorted(candidates):
+            if start > last_end:
+                found.append(term)
+                last_end = start - neg_length - 1
+        
+        return found
+    
+    def check_logo_presence(
+        self,
+        image_path: Path,
+        logo_path: Path = None,
+        image: Image.Image = None
+    ) -> Dict:
         """
-        Verify logo appears in final image using simple template matching.
+        Verify logo appears in final image using template matching.
+        
+        The logo is scaled the way CreativeComposer places it and matched over
+        the grayscale image with FFT-based normalized cross-correlation, coarse
+        to fine; only the logo's opaque pixels take part in the match.
         
         Args:
             image_path: Path to generated image
             logo_path: Path to logo template
+            image: Already decoded image_path (loaded from disk if omitted)
             
         Returns:
             Dictionary with detection status and confidence
@@ -94,12 +520,14 @@ class ComplianceChecker:
             }
         
         try:
-            # Load images
-            image = Image.open(image_path).convert('RGB')
-            logo = Image.open(logo_path).convert('RGB')
+            # Load images (the template is prepared once per logo file)
+            if image is None:
+                image = Image.open(image_path)
+            image = image.convert('L')
+            template = self._get_logo_template(logo_path)
             
             # Simple check: logo should be much smaller than image
-            if logo.width >= image.width * 0.3:
+            if template.size[0] >= image.width * 0.3:
                 logger.warning("Logo template is too large for reliable detection")
                 return {
                     "detected": None,
@@ -107,31 +535,19 @@ class ComplianceChecker:
                     "message": "Logo template too large for detection"
                 }
             
-            # Convert to numpy for simple correlation check
-            img_array = np.array(image)
-            logo_array = np.array(logo)
-            
-            # Very basic presence check - just verify logo colors exist in image
-            # (Real implementation would use template matching or feature detection)
-            logo_colors = logo_array.reshape(-1, 3)
-            unique_logo_colors = np.unique(logo_colors, axis=0)
-            
-            # Check if distinctive logo colors appear in the image
-            # This is a simplified heuristic
-            color_matches = 0
-            for color in unique_logo_colors[:10]:  # Check top 10 colors
-                # Check if similar colors exist in image
-                img_colors = img_array.reshape(-1, 3)
-                distances = np.sqrt(np.sum((img_colors - color) ** 2, axis=1))
-                if np.min(distances) < 50:  # Color similarity threshold
-                    color_matches += 1
+            if template.norm == 0.0:
+                return {
+                    "detected": None,
+                    "confidence": 0.0,
+                    "message": "Logo template has no detail to match"
+                }
             
-            confidence = color_matches / min(10, len(unique_logo_colors))
-            detected = confidence > 0.5
+            confidence = max(template.best_score(image), 0.0)
+            detected = confidence > LOGO_MATCH_THRESHOLD
             
             result = {
                 "detected": detected,
-                "confidence": float(confidence),
+                "confidence": confidence,
                 "message": "Logo likely present" if detected else "Logo may not be present"
             }
             
@@ -150,23 +566,94 @@ class ComplianceChecker:
                 "message": f"Error during detection: {str(e)}"
             }
     
-    def validate_brand_colors(self, image_path: Path, brand_colors: List[str] = None) -> Dict:
+    def _get_logo_template(self, logo_path: Path) -> _LogoTemplate:
+        """
+        Load a logo as a matching template, cached per file version.
+        
+        Args:
+            logo_path: Path to logo template
+            
+        Returns:
+            Prepared _LogoTemplate
+        """
+        logo_path = str(logo_path)
+        key = (logo_path, Path(logo_path).stat().st_mtime_ns)
+        
+        template = self._logo_template_cache.get(key)
+        if template is None:
+            with Image.open(logo_path) as logo:
+                logo = logo.convert('RGBA')
+                
+                # Same scaling as CreativeComposer._load_logo
+                max_logo_size = Defaults.LOGO_MAX_SIZE
+                ratio = min(max_logo_size / logo.width, max_logo_size / logo.height)
+                new_size = (int(logo.width * ratio), int(logo.height * ratio))
+                logo = logo.resize(new_size, Image.Resampling.LANCZOS)
+            
+            template = _LogoTemplate(logo)
+            
+            # Downsampled template for the coarse search (skip if too small to match)
+            coarse_logo = logo.reduce(LOGO_PYRAMID_FACTOR)
+            if min(coarse_logo.size) >= 8:
+                coarse = _LogoTemplate(coarse_logo)
+                if coarse.norm > 0.0:
+                    template.coarse = coarse
+            
+            self._logo_template_cache[key] = template
+        
+        return template
+    
+    def _load_image_for_color_check(self, image_path: Path) -> np.ndarray:
+        """
+        Load an image as a downsampled RGB array for color presence checks.
+        
+        Nearest-neighbour sampling keeps actual pixel colors (no blending), so
+        any color region larger than a few pixels is still represented.
+        
+        Args:
+            image_path: Path to image
+            
+        Returns:
+            (H, W, 3) uint8 array
+        """
+        with Image.open(image_path) as image:
+            if image.format == 'JPEG':
+                # libjpeg decodes straight at 1/2, 1/4 or 1/8 scale via the DCT
+                image.draft('RGB', self._color_check_size(image))
+            return self._sample_colors(image)
+    
+    def _color_check_size(self, image: Image.Image) -> Tuple[int, int]:
+        """Downsampled size used for color presence checks."""
+        return (
+            max(1, image.width // COLOR_CHECK_DOWNSAMPLE),
+            max(1, image.height // COLOR_CHECK_DOWNSAMPLE)
+        )
+    
+    def _sample_colors(self, image: Image.Image) -> np.ndarray:
+        """Downsample a decoded image to an RGB array for color presence checks."""
+        size = self._color_check_size(image)
+        return np.asarray(image.convert('RGB').resize(size, Image.Resampling.NEAREST))
+    
+    def validate_brand_colors(
+        self,
+        image_path: Path,
+        brand_colors: List[str] = None,
+        img_array: np.ndarray = None
+    ) -> Dict:
         """
         Check if brand colors are present in the image.
         
         Args:
             image_path: Path to generated image
             brand_colors: List of hex color codes
+            img_array: Color check sample of image_path, as returned by
+                _sample_colors() (loaded from disk if omitted)
             
         Returns:
             Dictionary with color presence validation
         """
         if brand_colors is None:
-            brand_colors = [
-                self.brand_config.get('primary_color'),
-                self.brand_config.get('secondary_color')
-            ]
-            brand_colors = [c for c in brand_colors if c]
+            brand_colors = self._brand_colors
         
         if not brand_colors:
             return {
@@ -175,37 +662,15 @@ class ComplianceChecker:
             }
         
         try:
-            image = Image.open(image_path).convert('RGB')
-            img_array = np.array(image)
-            
-            colors_found = []
-            for hex_color in brand_colors:
-                # Convert hex to RGB
-                hex_color = hex_color.lstrip('#')
-                target_rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-                
-                # Check if similar color exists in image
-                img_colors = img_array.reshape(-1, 3)
-                distances = np.sqrt(np.sum((img_colors - np.array(target_rgb)) ** 2, axis=1))
-                
-                if np.min(distances) < 80:  # Generous threshold for color presence
-                    colors_found.append(hex_color)
-            
-            compliant = len(colors_found) > 0
+            if img_array is None:
+                img_array = self._load_image_for_color_check(image_path)
             
-            result = {
-                "compliant": compliant,
-                "brand_colors_checked": brand_colors,
-                "colors_detected": colors_found,
-                "detection_rate": len(colors_found) / len(brand_colors)
-            }
+            # Convert hex to RGB (parsed once per color set, then cached)
+            targets = _color_targets(tuple(brand_colors))
             
-            if compliant:
-                logger.info(f"✓ Brand colors detected: {len(colors_found)}/{len(brand_colors)}")
-            else:
-                logger.warning("⚠️  No brand colors detected in image")
-            
-            return result
+            # Check all brand colors against the image in one broadcast pass
+            min_d2 = _min_sq_distances(img_array.reshape(-1, 3), targets)
+            return self._brand_color_result(brand_colors, min_d2)
             
         except Exception as e:
             logger.error(f"Failed to validate brand colors: {e}")
@@ -214,6 +679,64 @@ class ComplianceChecker:
                 "message": f"Error during validation: {str(e)}"
             }
     
+    def _brand_color_result(self, brand_colors: List[str], min_d2: np.ndarray) -> Dict:
+        """
+        Build a brand color validation result from per-color minimum distances.
+        
+        Args:
+            brand_colors: Hex color codes that were checked
+            min_d2: Minimum squared distance from the image to each color
+            
+        Returns:
+            Dictionary with color presence validation
+        """
+        present = min_d2 < 80 ** 2  # Generous threshold for color presence
+        colors_found = [c.lstrip('#') for c, found in zip(brand_colors, present) if found]
+        
+        compliant = len(colors_found) > 0
+        
+        result = {
+            "compliant": compliant,
+            "brand_colors_checked": list(brand_colors),
+            "colors_detected": colors_found,
+            "detection_rate": len(colors_found) / len(brand_colors)
+        }
+        
+        if compliant:
+            logger.info(f"✓ Brand colors detected: {len(colors_found)}/{len(brand_colors)}")
+        else:
+            logger.warning("⚠️  No brand colors detected in image")
+        
+        return result
+    
+    def _validate_brand_colors_batch(self, samples: List[Optional[np.ndarray]]) -> List[Optional[Dict]]:
+        """
+        Validate the configured brand colors for many images in one stacked pass.
+        
+        Args:
+            samples: Color check samples (see _sample_colors), None where an
+                image could not be decoded
+            
+        Returns:
+            Results in the same order; None where the image still needs the
+            per-image check (no sample, no colors configured, or a batch error)
+        """
+        results: List[Optional[Dict]] = [None] * len(samples)
+        valid = [i for i, sample in enumerate(samples) if sample is not None]
+        if not self._brand_colors or not valid:
+            return results
+        
+        try:
+            targets = _color_targets(tuple(self._brand_colors))
+            min_d2 = _min_sq_distances_per_image([samples[i] for i in valid], targets)
+        except Exception as e:
+            logger.warning(f"Batched brand color check failed, checking per image: {e}")
+            return results
+        
+        for i, row in zip(valid, min_d2):
+            results[i] = self._brand_color_result(self._brand_colors, row)
+        return results
+    
     def check_text_contrast(self, text_color: Tuple[int, int, int], 
                            bg_color: Tuple[int, int, int]) -> Dict:
         """
@@ -226,23 +749,7 @@ class ComplianceChecker:
         Returns:
             Dictionary with contrast ratio and compliance status
         """
-        def luminance(color):
-            """Calculate relative luminance."""
-            rgb = [c / 255.0 for c in color]
-            rgb = [
-                c / 12.92 if c <= 0.03928 
-                else ((c + 0.055) / 1.055) ** 2.4 
-                for c in rgb
-            ]
-            return 0.2126 * rgb[0] + 0.7152 * rgb[1] + 0.0722 * rgb[2]
-        
-        l1 = luminance(text_color)
-        l2 = luminance(bg_color)
-        
-        if l1 > l2:
-            ratio = (l1 + 0.05) / (l2 + 0.05)
-        else:
-            ratio = (l2 + 0.05) / (l1 + 0.05)
+        ratio = float(_contrast_ratio(text_color, bg_color))
         
         result = {
             "ratio": round(ratio, 2),
@@ -258,6 +765,19 @@ class ComplianceChecker:
         
         return result
     
+    def check_text_contrast_batch(self, text_colors: np.ndarray, bg_colors: np.ndarray) -> np.ndarray:
+        """
+        Compute WCAG contrast ratios for many text/background pairs at once.
+        
+        Args:
+            text_colors: (N, 3) or (N, 4) array of RGB(A) text colors
+            bg_colors: (N, 3) or (N, 4) array of RGB(A) background colors
+            
+        Returns:
+            (N,) array of contrast ratios (>= 4.5 passes AA, >= 7.0 passes AAA)
+        """
+        return _contrast_ratio(text_colors, bg_colors)
+    
     def run_full_compliance_check(self, image_path: Path, campaign_message: str) -> Dict:
         """
         Run all compliance checks on a generated asset.
@@ -269,22 +789,133 @@ class ComplianceChecker:
         Returns:
             Comprehensive compliance report
         """
+        legal_result = self.check_legal_content(campaign_message)
+        return self._build_report(image_path, legal_result)
+    
+    def run_full_compliance_check_batch(self, image_paths: List[Path], campaign_message: str) -> List[Dict]:
+        """
+        Run all compliance checks on a batch of assets sharing one campaign message.
+        
+        The legal content check runs once for the shared message instead of once
+        per asset. Assets are decoded in parallel threads, and brand colors
+        are checked for the whole batch in one stacked pass; the logo check
+        still runs per asset (sharing one cached template).
+        
+        Args:
+            image_paths: Paths to generated images
+            campaign_message: Campaign text to check
+            
+        Returns:
+            List of compliance reports, in the same order as image_paths
+        """
+        if not image_paths:
+            return []
+        
+        logger.info(f"Running compliance checks on {len(image_paths)} assets...")
+        
+        legal_result = self.check_legal_content(campaign_message)
+        image_paths = [Path(p) for p in image_paths]
+        
+        if len(image_paths) == 1:
+            return [self._build_report(image_paths[0], legal_result)]
+        
+        workers = min(len(image_paths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Decode all assets in parallel (PIL releases the GIL while decoding)
+            decoded = list(executor.map(self._decode_for_checks, image_paths))
+            
+            brand_results = self._validate_brand_colors_batch([sample for _, sample in decoded])
+            
+            # Logo matching is FFT-bound NumPy work, which also releases the GIL
+            images, samples = zip(*decoded)
+            return list(executor.map(
+                self._build_report,
+                image_paths, repeat(legal_result), images, samples, brand_results
+            ))
+    
+    def _decode_for_checks(self, image_path: Path) -> Tuple[Optional[Image.Image], Optional[np.ndarray]]:
+        """
+        Decode an image once for all image checks.
+        
+        Args:
+            image_path: Path to generated image
+            
+        Returns:
+            Tuple of (RGB image, color check sample). The image is None when
+            no logo check needs it; both are None if no image check needs
+            pixels or the file could not be decoded (each check then
+            re-opens the file and reports the error itself)
+        """
+        if not (self.brand_config.get('logo_path') or self._brand_colors):
+            return None, None
+        
+        try:
+            if not self.brand_config.get('logo_path'):
+                # Only the color sample is needed - JPEGs can skip the full decode
+                return None, self._load_image_for_color_check(image_path)
+            
+            with Image.open(image_path) as img:
+                image = img.convert('RGB')
+            return image, self._sample_colors(image)
+        except Exception:
+            return None, None
+    
+    def _build_report(
+        self,
+        image_path: Path,
+        legal_result: Dict,
+        image: Image.Image = None,
+        color_sample: np.ndarray = None,
+        brand_result: Dict = None
+    ) -> Dict:
+        """
+        Run the image checks for one asset and assemble its compliance report.
+        
+        Args:
+            image_path: Path to generated image
+            legal_result: Result of check_legal_content() for the asset's text
+            image: Decoded image (decoded here if omitted)
+            color_sample: Color check sample of the image
+            brand_result: Brand color result computed for a whole batch
+            
+        Returns:
+            Comprehensive compliance report
+        """
+        image_path = Path(image_path)
         logger.info(f"Running compliance checks on {image_path.name}...")
         
         report = {
             "image": str(image_path),
-            "timestamp": Path(image_path).stat().st_mtime,
+            "timestamp": image_path.stat().st_mtime,
             "checks": {}
         }
         
+        # Decode the image once and share it between the image checks
+        if image is None and color_sample is None:
+            image, color_sample = self._decode_for_checks(image_path)
+        
         # Legal content check
-        report["checks"]["legal_content"] = self.check_legal_content(campaign_message)
+        report["checks"]["legal_content"] = legal_result
+        
+        # Logo presence and brand color checks are NumPy-heavy and release
+        # the GIL - overlap them when both have to run here
+        if brand_result is None and self.brand_config.get('logo_path') and self._brand_colors:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                brand_future = executor.submit(
+                    self.validate_brand_colors, image_path, None, color_sample
+                )
+                logo_result = self.check_logo_presence(image_path, image=image)
+                brand_result = brand_future.result()
+        else:
+            logo_result = self.check_logo_presence(image_path, image=image)
+            if brand_result is None:
+                brand_result = self.validate_brand_colors(image_path, img_array=color_sample)
         
         # Logo presence check
-        report["checks"]["logo_presence"] = self.check_logo_presence(image_path)
+        report["checks"]["logo_presence"] = logo_result
         
         # Brand color validation
-        report["checks"]["brand_colors"] = self.validate_brand_colors(image_path)
+        report["checks"]["brand_colors"] = brand_result
         
         # Overall compliance
         legal_ok = report["checks"]["legal_content"]["compliant"]
@@ -299,4 +930,4 @@ class ComplianceChecker:
         else:
             logger.warning(f"⚠️  Overall compliance: ISSUES DETECTED")
         
-        return report
\ No newline at end of file
+        return report
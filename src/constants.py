@@ -5,13 +5,49 @@ Centralized definitions for aspect ratios, dimensions, and other constants.
 Single source of truth to avoid duplication across the codebase.
 """
 
-from typing import Dict, Tuple
+from types import MappingProxyType
+from typing import Mapping, Tuple
 
 
 # =============================================================================
 # ASPECT RATIOS & DIMENSIONS
 # =============================================================================
 
+# Read-only lookup tables, shared by AspectRatios (safe to use from any thread)
+
+# Dimension mappings for output/composition
+_OUTPUT_DIMENSIONS: Mapping[str, Tuple[int, int]] = MappingProxyType({
+    "1x1": (1080, 1080),      # Instagram feed, Twitter
+    "9x16": (1080, 1920),     # Instagram/TikTok stories
+    "16x9": (1920, 1080),     # YouTube thumbnail, Facebook feed
+    "4x5": (1080, 1350),      # Instagram portrait
+    "2x3": (1080, 1620),      # Pinterest
+})
+
+# Dimension mappings for generation (may differ from output)
+_GENERATION_DIMENSIONS: Mapping[str, Tuple[int, int]] = MappingProxyType({
+    "1x1": (1024, 1024),      # Square
+    "9x16": (1080, 1920),     # Portrait story
+    "16x9": (1920, 1080),     # Landscape feed
+    "4x3": (1024, 768),       # Landscape 4:3
+    "3x4": (768, 1024),       # Portrait 3:4
+})
+
+# Flux API format strings (provider-specific)
+_FLUX_FORMATS: Mapping[str, str] = MappingProxyType({
+    "1x1": "square",
+    "9x16": "portrait_16_9",
+    "16x9": "landscape_16_9",
+    "4x3": "landscape_4_3",
+    "3x4": "portrait_3_4",
+})
+
+# Fallbacks for unknown format names
+_DEFAULT_OUTPUT_SIZE = (1080, 1080)
+_DEFAULT_GENERATION_SIZE = (1920, 1080)
+_DEFAULT_FLUX_FORMAT = "landscape_16_9"
+
+
 class AspectRatios:
     """
     Centralized aspect ratio definitions.
@@ -25,35 +61,13 @@ class AspectRatios:
     PORTRAIT_STORY = "9x16"
     LANDSCAPE_FEED = "16x9"
     
-    # Dimension mappings for output/composition
-    OUTPUT_DIMENSIONS: Dict[str, Tuple[int, int]] = {
-        "1x1": (1080, 1080),      # Instagram feed, Twitter
-        "9x16": (1080, 1920),     # Instagram/TikTok stories
-        "16x9": (1920, 1080),     # YouTube thumbnail, Facebook feed
-        "4x5": (1080, 1350),      # Instagram portrait
-        "2x3": (1080, 1620),      # Pinterest
-    }
-    
-    # Dimension mappings for generation (may differ from output)
-    GENERATION_DIMENSIONS: Dict[str, Tuple[int, int]] = {
-        "1x1": (1024, 1024),      # Square
-        "9x16": (1080, 1920),     # Portrait story
-        "16x9": (1920, 1080),     # Landscape feed
-        "4x3": (1024, 768),       # Landscape 4:3
-        "3x4": (768, 1024),       # Portrait 3:4
-    }
-    
-    # Flux API format strings (provider-specific)
-    FLUX_FORMATS: Dict[str, str] = {
-        "1x1": "square",
-        "9x16": "portrait_16_9",
-        "16x9": "landscape_16_9",
-        "4x3": "landscape_4_3",
-        "3x4": "portrait_3_4",
-    }
+    # Read-only views of the lookup tables
+    OUTPUT_DIMENSIONS = _OUTPUT_DIMENSIONS
+    GENERATION_DIMENSIONS = _GENERATION_DIMENSIONS
+    FLUX_FORMATS = _FLUX_FORMATS
     
-    @classmethod
-    def get_output_size(cls, format_name: str) -> Tuple[int, int]:
+    @staticmethod
+    def get_output_size(format_name: str) -> Tuple[int, int]:
         """
         Get output dimensions for a format.
         
@@ -63,10 +77,10 @@ class AspectRatios:
         Returns:
             (width, height) tuple
         """
-        return cls.OUTPUT_DIMENSIONS.get(format_name, (1080, 1080))
+        return _OUTPUT_DIMENSIONS.get(format_name, _DEFAULT_OUTPUT_SIZE)
     
-    @classmethod
-    def get_generation_size(cls, format_name: str) -> Tuple[int, int]:
+    @staticmethod
+    def get_generation_size(format_name: str) -> Tuple[int, int]:
         """
         Get generation dimensions for a format.
         
@@ -76,10 +90,10 @@ class AspectRatios:
         Returns:
             (width, height) tuple
         """
-        return cls.GENERATION_DIMENSIONS.get(format_name, (1920, 1080))
+        return _GENERATION_DIMENSIONS.get(format_name, _DEFAULT_GENERATION_SIZE)
     
-    @classmethod
-    def get_flux_format(cls, format_name: str) -> str:
+    @staticmethod
+    def get_flux_format(format_name: str) -> str:
         """
         Get Flux API format string for a format.
         
@@ -89,12 +103,12 @@ class AspectRatios:
         Returns:
             Flux format string like "square", "portrait_16_9"
         """
-        return cls.FLUX_FORMATS.get(format_name, "landscape_16_9")
+        return _FLUX_FORMATS.get(format_name, _DEFAULT_FLUX_FORMAT)
     
-    @classmethod
-    def all_formats(cls) -> list:
+    @staticmethod
+    def all_formats() -> list:
         """Get list of all supported formats."""
-        return list(cls.OUTPUT_DIMENSIONS.keys())
+        return list(_OUTPUT_DIMENSIONS)
 
 
 # =============================================================================
@@ -126,6 +140,10 @@ class Paths:
     
     OUTPUTS = "outputs"
     CAMPAIGN_BRIEFS = "campaign_briefs"
+    
+    LLM_CACHE = "outputs/.llm_cache"
+    SEMANTIC_CACHE = "outputs/.sem_cache"
+    FLUX_CACHE = "outputs/.flux_cache"
 
 
 # =============================================================================
@@ -139,15 +157,50 @@ class Defaults:
     DEFAULT_ASPECT_RATIO = "16x9"
     DEFAULT_GUIDANCE_SCALE = 3.5
     DEFAULT_INFERENCE_STEPS = 28
+    MAX_CONCURRENT_IMAGES = 8  # In-flight fal.ai queue requests in generate_images_concurrent
+    FLUX_CACHE_TTL_SECONDS = 86400  # Reuse a generated image URL for identical requests for a day
+    
+    # Prompt engineering
+    MAX_CONCURRENT_PROMPTS = 10  # In-flight LLM calls in batch_create_prompts
+    PROMPT_MAX_TOKENS = 300  # Completion budget per generated image prompt
+    PROMPT_BATCH_MAX_OUTPUT_TOKENS = 4096  # Completion cap of most chat models
+    DEFAULT_CONTEXT_TOKENS = 8192  # Assumed for models missing from MODEL_CONTEXT_TOKENS
+    MODEL_CONTEXT_TOKENS = {  # Matched by longest prefix (e.g. "gpt-4-0613" -> "gpt-4")
+        "gpt-4": 8192,
+        "gpt-4-32k": 32768,
+        "gpt-4-turbo": 128000,
+        "gpt-4o": 128000,
+        "gpt-3.5-turbo": 16385
+    }
+    OPENAI_MAX_RETRIES = 3  # SDK retries 408/409/429/5xx with exponential backoff + jitter
+    OPENAI_TIMEOUT_SECONDS = 120  # Per-request timeout (connect timeout is 5s)
+    OPENAI_MAX_CONNECTIONS = 100
+    OPENAI_KEEPALIVE_SECONDS = 60  # Idle pooled connections are kept this long
+    LLM_CACHE_MAX_TEMPERATURE = 0.1  # Only near-deterministic calls are cached
+    LLM_CACHE_TTL_SECONDS = 86400  # Cached LLM responses expire after a day
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity needed to reuse a response
+    SEMANTIC_CACHE_MAX_TEMPERATURE = 0.3
+    BATCH_POLL_INTERVAL_SECONDS = 30  # Batch API status polling interval
+    BATCH_COMPLETION_WINDOW = "24h"
     
     # Text overlay
-    DEFAULT_FONT_SIZE_RATIO = 0.08  # 8% of smaller dimension
+    DEFAULT_FONT_SIZE_RATIO = 0.08  # 8% of smaller dimension (upper bound)
+    MIN_FONT_SIZE = 12  # Smallest size tried when shrinking long messages
+    TEXT_MAX_HEIGHT_RATIO = 0.3  # Wrapped text may use up to 30% of image height
     DEFAULT_TEXT_COLOR = "#FFFFFF"
     DEFAULT_TEXT_POSITION = "bottom"
     
+    # Output encoding
+    PNG_COMPRESS_LEVEL = 1  # zlib level 1: ~3-4x faster than the default 6
+    OUTPUT_FORMAT = "png"  # "png" or "webp" (brand_config "output_format")
+    WEBP_QUALITY = 90
+    WEBP_METHOD = 0  # libwebp's fastest encoder setting
+    
     # Logo
     DEFAULT_LOGO_SCALE = 0.12  # 12% of image width
     DEFAULT_LOGO_POSITION = "top-right"
+    LOGO_MAX_SIZE = 150  # Longest side of the placed logo, in pixels
     
     # Negative prompt for image generation
     DEFAULT_NEGATIVE_PROMPT = (
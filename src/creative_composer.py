@@ -4,15 +4,435 @@ Creative Composer Module
 Handles image resizing, text overlay, logo placement, and asset composition.
 """
 
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
-from PIL import Image, ImageDraw, ImageFont, ImageColor
-from src.constants import AspectRatios
+import PIL
+from PIL import Image, ImageDraw, ImageFont, ImageColor, features
+from src.constants import AspectRatios, Defaults
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _log_imaging_backend() -> None:
+    """Log (once) whether the accelerated Pillow-SIMD / libjpeg-turbo builds are in use."""
+    # Pillow-SIMD releases carry a ".postN" suffix on the upstream version
+    simd = ".post" in PIL.__version__
+    turbo = features.check_feature("libjpeg_turbo")
+    logger.info(
+        f"  Imaging backend: Pillow {PIL.__version__} "
+        f"({'SIMD' if simd else 'standard'} build, "
+        f"libjpeg-turbo {'yes' if turbo else 'no'})"
+    )
+    if not simd:
+        logger.debug("  Install pillow-simd for faster resizing (see requirements.txt)")
+
+
+@lru_cache(maxsize=64)
+def _load_font(font_path: Optional[str], font_size: int) -> ImageFont.ImageFont:
+    """Load a font once per (path, size); None gives Pillow's default font."""
+    if font_path is None:
+        try:
+            # Pillow >= 10.1 embeds a scalable default font
+            return ImageFont.load_default(font_size)
+        except TypeError:
+            return ImageFont.load_default()
+    return ImageFont.truetype(font_path, font_size)
+
+
+# Bold system fonts tried in order for overlay text
+_FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux
+    "C:\\Windows\\Fonts\\arialbd.ttf",  # Windows
+    "/System/Library/Fonts/Helvetica.ttc",  # Mac
+)
+
+
+@lru_cache(maxsize=None)
+def _default_font_path() -> Optional[str]:
+    """
+    Find the overlay font once per process.
+    
+    Returns:
+        Path of the first candidate font that loads, or None for Pillow's default font
+    """
+    for candidate in _FONT_CANDIDATES:
+        if not Path(candidate).exists():
+            continue
+        try:
+            _load_font(candidate, Defaults.MIN_FONT_SIZE)
+            return candidate
+        except Exception as e:
+            logger.debug(f"Could not load font {candidate}: {e}")
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _text_width(font_path: Optional[str], font_size: int, text: str) -> int:
+    """Rendered width of text in pixels, cached across images."""
+    bbox = _load_font(font_path, font_size).getbbox(text)
+    return bbox[2] - bbox[0]
+
+
+@lru_cache(maxsize=1024)
+def _text_mask(font_path: Optional[str], font_size: int, text: str):
+    """
+    Rasterize a line of text once into a coverage mask, cached across images.
+    
+    Args:
+        font_path: Font file (None for Pillow's default font)
+        font_size: Font size in pixels
+        text: Line of text
+        
+    Returns:
+        Tuple of ('L' mask image, (x, y) offset of the mask from the draw origin)
+    """
+    font = _load_font(font_path, font_size)
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+    return mask, (left, top)
+
+
+@lru_cache(maxsize=4096)
+def _word_metrics(font_path: Optional[str], font_size: int, word: str) -> Tuple[float, int, int]:
+    """
+    Advance width and horizontal ink extent of a word, cached across images.
+    
+    Returns:
+        Tuple of (advance, left edge, right edge) relative to the pen position
+    """
+    font = _load_font(font_path, font_size)
+    left, _, right, _ = font.getbbox(word)
+    return font.getlength(word), left, right
+
+
+def _wrap_text(font_path: Optional[str], font_size: int, text: str, max_width: int) -> List[str]:
+    """
+    Greedily word-wrap text into lines no wider than max_width where possible.
+    
+    Advances add up across spaces, so a candidate line's width is the pen
+    position of its last word plus that word's right edge, minus the first
+    word's left edge - one cached lookup per word instead of re-measuring
+    the whole line each time it grows.
+    """
+    space = _load_font(font_path, font_size).getlength(' ')
+    lines = []
+    current_line = []
+    line_left = 0
+    line_end = 0.0  # Pen position after the last word on the line
+    
+    for word in text.split():
+        advance, left, right = _word_metrics(font_path, font_size, word)
+        
+        if current_line:
+            word_start = line_end + space
+            if word_start + right - line_left <= max_width:
+                current_line.append(word)
+                line_end = word_start + advance
+                continue
+            lines.append(' '.join(current_line))
+        
+        # Start a new line (a single word that is too long stays on its own)
+        current_line = [word]
+        line_left = left
+        line_end = advance
+    
+    if current_line:
+        lines.append(' '.join(current_line))
+    
+    return lines
+
+
+def _line_height(font_size: int) -> int:
+    """Baseline-to-baseline distance for wrapped lines (1.3x spacing)."""
+    return int(font_size * 1.3)
+
+
+@lru_cache(maxsize=256)
+def _fit_text(
+    font_path: Optional[str],
+    text: str,
+    max_width: int,
+    max_height: int,
+    max_font_size: int
+) -> Tuple[int, Tuple[str, ...]]:
+    """
+    Find the largest font size (up to max_font_size) whose wrapped text fits.
+    
+    Text fits when every line is at most max_width wide and the lines stack
+    to at most max_height. Wrapped size only grows with font size, so the
+    size is found by binary search; the result is cached, so a campaign
+    message is fitted once per output size.
+    
+    Args:
+        font_path: Font file (None for Pillow's default font)
+        text: Text to fit
+        max_width: Maximum line width in pixels
+        max_height: Maximum total height of the lines in pixels
+        max_font_size: Largest font size to use
+        
+    Returns:
+        Tuple of (font size, wrapped lines)
+    """
+    def layout(font_size):
+        lines = _wrap_text(font_path, font_size, text, max_width)
+        fits = (
+            len(lines) * _line_height(font_size) <= max_height
+            and all(_text_width(font_path, font_size, line) <= max_width for line in lines)
+        )
+        return fits, lines
+    
+    fits, lines = layout(max_font_size)
+    
+    # A bitmap font (old Pillow's default) has a single size - nothing to search
+    if fits or not isinstance(_load_font(font_path, max_font_size), ImageFont.FreeTypeFont):
+        return max_font_size, tuple(lines)
+    
+    low = min(Defaults.MIN_FONT_SIZE, max_font_size)
+    fits, low_lines = layout(low)
+    if not fits:
+        return low, tuple(low_lines)
+    
+    # Invariant: low fits, high does not
+    high = max_font_size
+    while high - low > 1:
+        mid = (low + high) // 2
+        fits, mid_lines = layout(mid)
+        if fits:
+            low, low_lines = mid, mid_lines
+        else:
+            high = mid
+    
+    return low, tuple(low_lines)
+
+
+def _text_layout(
+    text: str,
+    width: int,
+    height: int,
+    font_path: Optional[str]
+) -> Tuple[int, Tuple[str, ...]]:
+    """
+    Font size and wrapped lines for overlaying text on a width x height image.
+    
+    Depends only on the text, font and output size, so every product rendered
+    at the same size shares one layout (and its cached masks).
+    
+    Returns:
+        Tuple of (font size, wrapped lines)
+    """
+    # Text may use up to 85% of the width and a share of the height;
+    # the font size is capped at a fraction of the smaller dimension
+    max_text_width = int(width * 0.85)
+    max_text_height = int(height * Defaults.TEXT_MAX_HEIGHT_RATIO)
+    max_font_size = int(min(width, height) * Defaults.DEFAULT_FONT_SIZE_RATIO)
+    
+    # Largest font size (up to the cap) whose word-wrapped text fits the box
+    return _fit_text(font_path, text, max_text_width, max_text_height, max_font_size)
+
+
+@lru_cache(maxsize=64)
+def _text_layer(
+    text: str,
+    width: int,
+    height: int,
+    position: str,
+    bg_color: Tuple[int, int, int],
+    text_color: Tuple[int, int, int],
+    font_path: Optional[str]
+):
+    """
+    Render the text overlay block for a width x height image as one layer.
+    
+    The block is a semi-transparent background box with the wrapped text
+    drawn over it (drop shadow, 2px outline, fill). Every step blends a
+    constant color over what is below, so the whole block reduces to
+    out = color * alpha + image * (1 - alpha) and is applied with a single
+    masked paste. Cached across products, since it does not depend on the
+    underlying image.
+    
+    Args:
+        text: Text to overlay
+        width: Image width
+        height: Image height
+        position: Position ("top", "bottom", "center")
+        bg_color: RGB background box color (drawn at alpha 200)
+        text_color: RGB text fill color
+        font_path: Font file (None for Pillow's default font)
+        
+    Returns:
+        Tuple of (RGB color image, 'L' mask image, (x, y) paste offset)
+    """
+    # Font size and word wrap depend only on the text, font and image size
+    font_size, lines = _text_layout(text, width, height, font_path)
+    
+    # Calculate dimensions for multi-line text
+    line_height = _line_height(font_size)
+    total_text_height = len(lines) * line_height
+    
+    # Get max width of all lines
+    max_line_width = 0
+    for line in lines:
+        line_width = _text_width(font_path, font_size, line)
+        max_line_width = max(max_line_width, line_width)
+    
+    # Add padding
+    padding_x = 30
+    padding_y = 25
+    bg_width = max_line_width + (padding_x * 2)
+    bg_height = total_text_height + (padding_y * 2)
+    
+    # Calculate position based on aspect ratio
+    # For portrait images (9:16), position higher to avoid bottom cutoff
+    aspect_ratio = width / height
+    
+    if position == "bottom":
+        x = (width - bg_width) // 2
+        # Adjust bottom margin based on aspect ratio
+        if aspect_ratio < 0.7:  # Portrait (like 9:16)
+            bottom_margin = int(height * 0.05)  # 5% from bottom
+        else:  # Square or landscape
+            bottom_margin = 50
+        y = height - bg_height - bottom_margin
+    elif position == "top":
+        x = (width - bg_width) // 2
+        y = 50
+    else:  # center
+        x = (width - bg_width) // 2
+        y = (height - bg_height) // 2
+    
+    # Ensure text box doesn't go off screen
+    x = max(20, min(x, width - bg_width - 20))
+    y = max(20, min(y, height - bg_height - 20))
+    
+    # Shadow and outline are solid black (the shadow's old 180 alpha was
+    # always ignored on the RGB variations)
+    shadow_color = (0, 0, 0)
+    outline_color = (0, 0, 0)
+    
+    # Stamps in drawing order: (color, (x, y), mask) for shadow (offset
+    # by 3px), outline (2px thick) and main text of each centered line
+    stamps = []
+    text_y = y + padding_y
+    for line in lines:
+        line_width = _text_width(font_path, font_size, line)
+        text_x = x + (bg_width - line_width) // 2
+        
+        mask, (mask_x, mask_y) = _text_mask(font_path, font_size, line)
+        outline, (outline_x, outline_y) = _outline_mask(font_path, font_size, line)
+        
+        stamps.append((shadow_color, (text_x + mask_x + 3, text_y + mask_y + 3), mask))
+        stamps.append((outline_color, (text_x + outline_x, text_y + outline_y), outline))
+        stamps.append((text_color, (text_x + mask_x, text_y + mask_y), mask))
+        text_y += line_height
+    
+    # Layer covers the (inclusive) background box and every stamp, clipped to the image
+    boxes = [(x, y, x + bg_width + 1, y + bg_height + 1)]
+    boxes.extend((sx, sy, sx + m.width, sy + m.height) for _, (sx, sy), m in stamps)
+    left = max(0, min(b[0] for b in boxes))
+    top = max(0, min(b[1] for b in boxes))
+    right = min(width, max(b[2] for b in boxes))
+    bottom = min(height, max(b[3] for b in boxes))
+    
+    import numpy as np  # Deferred so importing the pipeline doesn't load NumPy
+    
+    # Track premultiplied color and the fraction of the image left showing.
+    # Color is planar (channel, y, x) so every blend broadcasts a mask over
+    # contiguous rows instead of striding across interleaved RGB.
+    color = np.zeros((3, bottom - top, right - left), np.float32)
+    keep = np.ones((bottom - top, right - left), np.float32)
+    
+    def blend(rgb, box, alpha):
+        bx0, by0, bx1, by1 = box
+        cx0, cy0 = max(bx0, left), max(by0, top)
+        cx1, cy1 = min(bx1, right), min(by1, bottom)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+        if not np.isscalar(alpha):
+            alpha = alpha[cy0 - by0:cy1 - by0, cx0 - bx0:cx1 - bx0]
+        region = (slice(cy0 - top, cy1 - top), slice(cx0 - left, cx1 - left))
+        # color += (rgb - color) * alpha, updated in place with one temporary
+        target = color[(slice(None),) + region]
+        delta = np.subtract(np.asarray(rgb, np.float32)[:, None, None], target)
+        delta *= alpha
+        target += delta
+        keep[region] *= 1 - alpha
+    
+    blend(bg_color, boxes[0], 200 / 255)
+    for rgb, (sx, sy), m in stamps:
+        blend(rgb, (sx, sy, sx + m.width, sy + m.height), np.asarray(m, np.float32) / 255)
+    
+    alpha = 1 - keep
+    straight = np.divide(color, alpha, out=np.zeros_like(color), where=alpha > 0)
+    straight += 0.5
+    np.clip(straight, 0, 255, out=straight)
+    layer = Image.merge('RGB', [Image.fromarray(channel.astype(np.uint8), 'L') for channel in straight])
+    mask = Image.fromarray((alpha * 255 + 0.5).astype(np.uint8), 'L')
+    
+    return layer, mask, (left, top)
+
+
+# Composer owned by a batch worker process, built once by _init_batch_worker
+_worker_composer = None
+
+
+def _init_batch_worker(brand_config: Dict) -> None:
+    """Build the worker's composer (and load its logo) once per process."""
+    global _worker_composer
+    _worker_composer = CreativeComposer(brand_config)
+
+
+def _create_variations_in_worker(
+    hero_image_path: Path,
+    campaign_message: str,
+    product_id: str,
+    output_folder: Path,
+    ratios: Optional[List[str]]
+) -> List[Path]:
+    """Run create_variations for one product on the worker's composer."""
+    return _worker_composer.create_variations(
+        hero_image_path, campaign_message, product_id, output_folder, ratios
+    )
+
+
+@lru_cache(maxsize=1024)
+def _outline_mask(font_path: Optional[str], font_size: int, text: str, width: int = 2):
+    """
+    Outline mask for a line of text: its coverage mask dilated by width pixels.
+    
+    Stands in for stamping the text at every offset in a (2*width+1)^2
+    square. The square max is separable, so it is done as 2*width+1
+    shifted np.maximum passes along each axis over one buffer.
+    
+    Returns:
+        Tuple of ('L' mask image, (x, y) offset of the mask from the draw origin)
+    """
+    import numpy as np  # Deferred so importing the pipeline doesn't load NumPy
+    
+    mask, (left, top) = _text_mask(font_path, font_size, text)
+    coverage = np.asarray(mask)
+    height, line_width = coverage.shape
+    span = 2 * width + 1
+    
+    rows = np.zeros((height, line_width + 2 * width), np.uint8)
+    for dx in range(span):
+        window = rows[:, dx:dx + line_width]
+        np.maximum(window, coverage, out=window)
+    
+    outline = np.zeros((height + 2 * width, line_width + 2 * width), np.uint8)
+    for dy in range(span):
+        window = outline[dy:dy + height]
+        np.maximum(window, rows, out=window)
+    
+    return Image.fromarray(outline, 'L'), (left - width, top - width)
+
+
 class CreativeComposer:
     """Composes final creative assets with text and branding."""
     
@@ -26,15 +446,58 @@ class CreativeComposer:
         self.brand_config = brand_config
         self.logo = self._load_logo() if brand_config.get("logo_path") else None
         
+        # The logo is never modified after loading, so one instance (and its
+        # paste mask) is shared by every variation and thread
+        self._logo_mask = self.logo if self.logo and self.logo.mode == 'RGBA' else None
+        self._logo_positions = {}
+        if self.logo:
+            for ratio in AspectRatios.all_formats():
+                self._logo_position(*AspectRatios.get_output_size(ratio), Defaults.DEFAULT_LOGO_POSITION)
+        
         # Parse brand colors
         self.primary_color = brand_config.get("primary_color", "#FF5733")
         self.secondary_color = brand_config.get("secondary_color", "#3498DB")
         self.font_color = brand_config.get("font_color", "#FFFFFF")
         
+        # Overlay font, resolved once (brand font if configured and loadable)
+        self.font_path = self._resolve_font_path(brand_config.get("font_path"))
+        
+        # Output encoding (PNG unless the brand asks for WebP)
+        self.output_format = self._resolve_output_format(
+            brand_config.get("output_format", Defaults.OUTPUT_FORMAT)
+        )
+        
         logger.info("CreativeComposer initialized")
         if self.logo:
             logger.info(f"  Logo loaded: {brand_config.get('logo_path')}")
         logger.info(f"  Brand colors: {self.primary_color}, {self.secondary_color}")
+        _log_imaging_backend()
+    
+    def _resolve_font_path(self, font_path: Optional[str]) -> Optional[str]:
+        """
+        Pick the overlay font: the brand's font_path if it loads, else a system font.
+        
+        Returns:
+            Font file path, or None for Pillow's default font
+        """
+        if font_path:
+            try:
+                _load_font(str(font_path), Defaults.MIN_FONT_SIZE)
+                return str(font_path)
+            except Exception as e:
+                logger.warning(f"Could not load brand font {font_path}: {e}")
+        return _default_font_path()
+    
+    def _resolve_output_format(self, output_format: str) -> str:
+        """Normalize the requested output format, falling back to PNG."""
+        output_format = str(output_format).lower()
+        if output_format not in ("png", "webp"):
+            logger.warning(f"Unsupported output format '{output_format}', using png")
+            return "png"
+        if output_format == "webp" and not features.check("webp"):
+            logger.warning("Pillow was built without WebP support, using png")
+            return "png"
+        return output_format
     
     def _load_logo(self) -> Optional[Image.Image]:
         """Load and resize brand logo."""
@@ -46,12 +509,17 @@ class CreativeComposer:
             
             logo = Image.open(logo_path)
             
-            # Ensure logo has transparency
-            if logo.mode != 'RGBA':
+            # Keep transparency only where the logo has some; opaque logos are
+            # pasted as plain RGB without a mask
+            if logo.mode in ('LA', 'La', 'PA') or 'transparency' in logo.info:
                 logo = logo.convert('RGBA')
+            elif logo.mode not in ('RGB', 'RGBA'):
+                logo = logo.convert('RGB')
+            if logo.mode == 'RGBA' and logo.getextrema()[3] == (255, 255):
+                logo = logo.convert('RGB')
             
             # Resize logo to reasonable size (max 150px on longest side)
-            max_logo_size = 150
+            max_logo_size = Defaults.LOGO_MAX_SIZE
             ratio = min(max_logo_size / logo.width, max_logo_size / logo.height)
             new_size = (int(logo.width * ratio), int(logo.height * ratio))
             logo = logo.resize(new_size, Image.Resampling.LANCZOS)
@@ -90,10 +558,11 @@ class CreativeComposer:
         logger.info(f"Creating {len(ratios)} variations for {product_id}")
         
         try:
-            # Load hero image
+            # Load and decode hero image once for all ratios
             hero_image = Image.open(hero_image_path)
             if hero_image.mode != 'RGB':
                 hero_image = hero_image.convert('RGB')
+            hero_image.load()
             
             # Create output folder for this product
             product_folder = output_folder / product_id
@@ -101,27 +570,41 @@ class CreativeComposer:
             
             generated_paths = []
             
-            for ratio in ratios:
-                logger.info(f"  Creating {ratio} variation...")
-                
-                # Resize image for this ratio
-                resized = self.resize_for_ratio(hero_image.copy(), ratio)
-                
-                # Add text overlay
-                with_text = self.add_text_overlay(resized, campaign_message)
-                
-                # Add logo if available
-                if self.logo:
-                    final = self.add_logo_overlay(with_text)
-                else:
-                    final = with_text
+            # Resample once per distinct aspect ratio, shared by same-aspect sizes
+            resized_by_ratio = self._resize_for_ratios(hero_image, ratios)
+            
+            # PNG encoding (zlib) releases the GIL - encode variations on worker
+            # threads while the next ratio is being composed
+            max_workers = max(1, min(len(ratios), os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pending = []
                 
-                # Save
-                output_path = product_folder / f"{ratio}.png"
-                final.save(output_path, 'PNG', quality=95)
-                generated_paths.append(output_path)
+                for ratio in ratios:
+                    logger.info(f"  Creating {ratio} variation...")
+                    
+                    # Each ratio owns its resized canvas, so overlays are
+                    # drawn straight onto it instead of onto fresh copies.
+                    # Canvases are handed off (not kept) so each is freed once
+                    # saved; a repeated ratio name gets a fresh canvas.
+                    final = resized_by_ratio.pop(ratio, None)
+                    if final is None:
+                        final = self.resize_for_ratio(hero_image, ratio)
+                    
+                    # Add text overlay
+                    self.add_text_overlay(final, campaign_message, in_place=True)
+                    
+                    # Add logo if available
+                    if self.logo:
+                        self.add_logo_overlay(final, in_place=True)
+                    
+                    # Save
+                    output_path = product_folder / f"{ratio}.{self.output_format}"
+                    pending.append((output_path, executor.submit(self._save_image, final, output_path)))
                 
-                logger.info(f"    ✓ Saved: {output_path.name}")
+                for output_path, future in pending:
+                    future.result()
+                    generated_paths.append(output_path)
+                    logger.info(f"    ✓ Saved: {output_path.name}")
             
             logger.info(f"✓ Created {len(generated_paths)} variations for {product_id}")
             return generated_paths
@@ -130,10 +613,67 @@ class CreativeComposer:
             logger.error(f"Failed to create variations: {e}")
             raise
     
+    def _save_image(self, image: Image.Image, output_path: Path) -> None:
+        """
+        Encode and write a finished variation as PNG or WebP.
+        
+        PNG uses a fast zlib level: creatives are photographic, so higher
+        levels cost several times the CPU for only a few percent smaller
+        files. WebP uses libwebp's fastest method, which still gives much
+        smaller files than PNG.
+        """
+        if self.output_format == "webp":
+            image.save(output_path, 'WEBP', quality=Defaults.WEBP_QUALITY, method=Defaults.WEBP_METHOD)
+        else:
+            image.save(output_path, 'PNG', compress_level=Defaults.PNG_COMPRESS_LEVEL)
+    
+    def _resize_for_ratios(self, image: Image.Image, ratios: List[str]) -> Dict[str, Image.Image]:
+        """
+        Resize/crop image for several ratios with one LANCZOS pass per aspect.
+        
+        Ratios whose output sizes share an aspect ratio (including unknown
+        names, which fall back to the default square size) are cut from the
+        largest of them; smaller sizes are box-downscaled from that canvas.
+        
+        Args:
+            image: PIL Image object
+            ratios: Ratio names (e.g., ["1x1", "9x16"])
+            
+        Returns:
+            Dictionary mapping ratio name to resized PIL Image (each a separate image)
+        """
+        sizes = {ratio: AspectRatios.get_output_size(ratio) for ratio in ratios}
+        
+        # Largest ratio of each aspect is the one that gets resampled from the hero
+        largest = {}
+        for ratio, (width, height) in sizes.items():
+            divisor = math.gcd(width, height)
+            aspect = (width // divisor, height // divisor)
+            if aspect not in largest or width > sizes[largest[aspect]][0]:
+                largest[aspect] = ratio
+        
+        resized = {}
+        for aspect, ratio in largest.items():
+            resized[ratio] = self.resize_for_ratio(image, ratio)
+        
+        for ratio, (width, height) in sizes.items():
+            if ratio in resized:
+                continue
+            divisor = math.gcd(width, height)
+            base = resized[largest[(width // divisor, height // divisor)]]
+            if base.size == (width, height):
+                resized[ratio] = base.copy()
+            else:
+                resized[ratio] = base.resize((width, height), Image.Resampling.BOX)
+        
+        return resized
+    
     def resize_for_ratio(self, image: Image.Image, ratio: str) -> Image.Image:
         """
         Resize/crop image to specific aspect ratio using smart center cropping.
         
+        The input image is not modified.
+        
         Args:
             image: PIL Image object
             ratio: Ratio name (e.g., "1x1", "9x16")
@@ -145,36 +685,40 @@ class CreativeComposer:
         target_ratio = target_width / target_height
         current_ratio = image.width / image.height
         
-        # Calculate scaling to cover the target size
+        # Calculate the centered source region matching the target aspect ratio
         if current_ratio > target_ratio:
-            # Image is wider - scale by height
-            scale = target_height / image.height
-            new_width = int(image.width * scale)
-            new_height = target_height
+            # Image is wider - crop the sides
+            crop_width = image.height * target_ratio
+            crop_height = image.height
         else:
-            # Image is taller - scale by width
-            scale = target_width / image.width
-            new_width = target_width
-            new_height = int(image.height * scale)
-        
-        # Resize image
-        resized = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Center crop to exact dimensions
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
-        
-        cropped = resized.crop((left, top, right, bottom))
-        
-        return cropped
+            # Image is taller - crop top and bottom
+            crop_width = image.width
+            crop_height = image.width / target_ratio
+        
+        left = (image.width - crop_width) / 2
+        top = (image.height - crop_height) / 2
+        
+        # Halve large sources with a cheap 2x2 box reduction first, so the
+        # LANCZOS pass only covers the last (less than 2x) step. Exact 2x/4x
+        # targets end at scale 1, and Pillow already skips resampling for a
+        # scale-1 box on whole pixels (e.g. 1x1 cut from a 1080px-tall hero),
+        # so those cases need no separate crop path.
+        while crop_width >= 2 * target_width and crop_height >= 2 * target_height:
+            image = image.reduce(2)
+            left, top, crop_width, crop_height = left / 2, top / 2, crop_width / 2, crop_height / 2
+        
+        box = (left, top, left + crop_width, top + crop_height)
+        
+        # Crop and resample in a single pass - reads from the source image
+        # without copying it, so one decoded hero can feed every ratio
+        return image.resize((target_width, target_height), Image.Resampling.LANCZOS, box=box)
     
     def add_text_overlay(
         self, 
         image: Image.Image, 
         text: str, 
-        position: str = "bottom"
+        position: str = "bottom",
+        in_place: bool = False
     ) -> Image.Image:
         """
         Add text overlay to image with semi-transparent background.
@@ -184,156 +728,41 @@ class CreativeComposer:
             image: PIL Image object
             text: Text to overlay
             position: Position ("top", "bottom", "center")
+            in_place: Draw onto image itself instead of a copy
             
         Returns:
             Image with text overlay
         """
-        # Create a copy to draw on
-        img_with_text = image.copy()
-        draw = ImageDraw.Draw(img_with_text, 'RGBA')
-        
-        # Calculate font size based on both width and height for better aspect ratio handling
-        # Use smaller dimension to ensure text fits
-        min_dimension = min(image.width, image.height)
-        max_text_width = int(image.width * 0.85)  # Text should be max 85% of image width
-        
-        # Start with a font size based on the smaller dimension
-        font_size = int(min_dimension * 0.08)  # 8% of smaller dimension
-        
-        # Try to load a nice font, fall back to default
-        try:
-            font_paths = [
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux
-                "C:\\Windows\\Fonts\\arialbd.ttf",  # Windows
-                "/System/Library/Fonts/Helvetica.ttc",  # Mac
-            ]
-            font = None
-            for font_path in font_paths:
-                if Path(font_path).exists():
-                    font = ImageFont.truetype(font_path, font_size)
-                    break
-            
-            if font is None:
-                font = ImageFont.load_default()
-        except Exception:
-            font = ImageFont.load_default()
+        img_with_text = image if in_place else image.copy()
         
-        # Word wrap the text if it's too wide
-        words = text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            test_width = bbox[2] - bbox[0]
-            
-            if test_width <= max_text_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    # Single word is too long, add it anyway
-                    lines.append(word)
-        
-        if current_line:
-            lines.append(' '.join(current_line))
+        # The whole text block (background, shadow, outline, text) is cached
+        # per message and image size and blended in with a single paste
+        layer, mask, offset = _text_layer(
+            text, image.width, image.height, position, *self._overlay_colors(), self.font_path
+        )
+        img_with_text.paste(layer, offset, mask)
         
-        # Calculate dimensions for multi-line text
-        line_height = int(font_size * 1.3)  # 1.3x spacing between lines
-        total_text_height = len(lines) * line_height
-        
-        # Get max width of all lines
-        max_line_width = 0
-        for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=font)
-            line_width = bbox[2] - bbox[0]
-            max_line_width = max(max_line_width, line_width)
-        
-        # Add padding
-        padding_x = 30
-        padding_y = 25
-        bg_width = max_line_width + (padding_x * 2)
-        bg_height = total_text_height + (padding_y * 2)
-        
-        # Calculate position based on aspect ratio
-        # For portrait images (9:16), position higher to avoid bottom cutoff
-        aspect_ratio = image.width / image.height
-        
-        if position == "bottom":
-            x = (image.width - bg_width) // 2
-            # Adjust bottom margin based on aspect ratio
-            if aspect_ratio < 0.7:  # Portrait (like 9:16)
-                bottom_margin = int(image.height * 0.05)  # 5% from bottom
-            else:  # Square or landscape
-                bottom_margin = 50
-            y = image.height - bg_height - bottom_margin
-        elif position == "top":
-            x = (image.width - bg_width) // 2
-            y = 50
-        else:  # center
-            x = (image.width - bg_width) // 2
-            y = (image.height - bg_height) // 2
-        
-        # Ensure text box doesn't go off screen
-        x = max(20, min(x, image.width - bg_width - 20))
-        y = max(20, min(y, image.height - bg_height - 20))
-        
-        # Draw semi-transparent background
+        return img_with_text
+    
+    def _overlay_colors(self) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+        """Parse the brand's text box and font colors as RGB tuples."""
         try:
-            bg_color = ImageColor.getrgb(self.primary_color) + (200,)  # Add alpha
+            bg_color = ImageColor.getrgb(self.primary_color)[:3]
         except Exception:
-            bg_color = (255, 87, 51, 200)  # Fallback color
-        
-        draw.rectangle(
-            [x, y, x + bg_width, y + bg_height],
-            fill=bg_color
-        )
-        
-        # Draw each line of text with shadow and outline
-        text_y = y + padding_y
+            bg_color = (255, 87, 51)  # Fallback color
         
         try:
-            text_color = ImageColor.getrgb(self.font_color)
+            text_color = ImageColor.getrgb(self.font_color)[:3]
         except Exception:
             text_color = (255, 255, 255)  # White fallback
         
-        # Shadow and outline colors
-        shadow_color = (0, 0, 0, 180)  # Semi-transparent black
-        outline_color = (0, 0, 0, 255)  # Solid black outline
-        
-        for line in lines:
-            # Center each line
-            bbox = draw.textbbox((0, 0), line, font=font)
-            line_width = bbox[2] - bbox[0]
-            text_x = x + (bg_width - line_width) // 2
-            
-            # Draw drop shadow (offset by 3px)
-            draw.text((text_x + 3, text_y + 3), line, font=font, fill=shadow_color)
-            
-            # Draw outline (2px thick)
-            for offset_x in [-2, -1, 0, 1, 2]:
-                for offset_y in [-2, -1, 0, 1, 2]:
-                    if offset_x != 0 or offset_y != 0:
-                        draw.text(
-                            (text_x + offset_x, text_y + offset_y), 
-                            line, 
-                            font=font, 
-                            fill=outline_color
-                        )
-            
-            # Draw main text on top
-            draw.text((text_x, text_y), line, font=font, fill=text_color)
-            text_y += line_height
-        
-        return img_with_text
+        return bg_color, text_color
     
     def add_logo_overlay(
         self, 
         image: Image.Image, 
-        position: str = "top-right"
+        position: str = "top-right",
+        in_place: bool = False
     ) -> Image.Image:
         """
         Add logo to image in specified corner.
@@ -341,6 +770,7 @@ class CreativeComposer:
         Args:
             image: PIL Image object
             position: Position for logo (top-right, top-left, bottom-right, bottom-left)
+            in_place: Paste onto image itself instead of a copy
             
         Returns:
             Image with logo overlay
@@ -349,29 +779,67 @@ class CreativeComposer:
             logger.warning("No logo available to add")
             return image
         
-        # Create a copy
-        img_with_logo = image.copy()
+        img_with_logo = image if in_place else image.copy()
+        
+        # Paste logo, blending through its alpha when it has any
+        img_with_logo.paste(
+            self.logo,
+            self._logo_position(image.width, image.height, position),
+            self._logo_mask
+        )
+        
+        return img_with_logo
+    
+    def _logo_position(self, width: int, height: int, position: str) -> Tuple[int, int]:
+        """
+        Top-left paste coordinates of the logo, memoized per image size and corner.
+        
+        Args:
+            width: Image width
+            height: Image height
+            position: Position for logo (top-right, top-left, bottom-right, bottom-left)
+            
+        Returns:
+            (x, y) tuple
+        """
+        key = (width, height, position)
+        coords = self._logo_positions.get(key)
+        if coords is not None:
+            return coords
         
         # Calculate position with padding
         padding = 30
         
         if position == "top-right":
-            x = image.width - self.logo.width - padding
+            x = width - self.logo.width - padding
             y = padding
         elif position == "top-left":
             x = padding
             y = padding
         elif position == "bottom-right":
-            x = image.width - self.logo.width - padding
-            y = image.height - self.logo.height - padding
+            x = width - self.logo.width - padding
+            y = height - self.logo.height - padding
         else:  # bottom-left
             x = padding
-            y = image.height - self.logo.height - padding
+            y = height - self.logo.height - padding
         
-        # Paste logo with transparency
-        img_with_logo.paste(self.logo, (x, y), self.logo)
+        coords = self._logo_positions[key] = (x, y)
+        return coords
+    
+    def _prepare_text_layouts(self, campaign_message: str, ratios: List[str]) -> None:
+        """
+        Render the text overlay layer once for each distinct output size.
         
-        return img_with_logo
+        Args:
+            campaign_message: Text that will be overlaid
+            ratios: Ratio names that will be rendered
+        """
+        colors = self._overlay_colors()
+        sizes = {AspectRatios.get_output_size(ratio) for ratio in ratios}
+        for width, height in sizes:
+            _text_layer(
+                campaign_message, width, height, Defaults.DEFAULT_TEXT_POSITION, *colors, self.font_path
+            )
     
     def batch_create_variations(
         self,
@@ -394,19 +862,58 @@ class CreativeComposer:
         """
         logger.info(f"Batch creating variations for {len(hero_images)} products")
         
+        if ratios is None:
+            ratios = AspectRatios.all_formats()
+        
+        # Lay the message out once per output size bucket before fanning out;
+        # forked workers inherit the warm caches instead of each redoing it
+        self._prepare_text_layouts(campaign_message, ratios)
+        
         results = {}
-        for product_id, hero_path in hero_images.items():
-            try:
-                paths = self.create_variations(
+        max_workers = min(len(hero_images), os.cpu_count() or 1)
+        
+        if max_workers <= 1:
+            for product_id, hero_path in hero_images.items():
+                try:
+                    results[product_id] = self.create_variations(
+                        hero_path,
+                        campaign_message,
+                        product_id,
+                        output_folder,
+                        ratios
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to create variations for {product_id}: {e}")
+                    results[product_id] = []
+            return results
+        
+        # Products are independent and composition is CPU-bound, so fan them
+        # out over processes. Each worker rebuilds its composer from
+        # brand_config once instead of pickling the loaded logo per task.
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_batch_worker,
+            initargs=(self.brand_config,)
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _create_variations_in_worker,
                     hero_path,
                     campaign_message,
                     product_id,
                     output_folder,
                     ratios
-                )
-                results[product_id] = paths
-            except Exception as e:
-                logger.error(f"Failed to create variations for {product_id}: {e}")
-                results[product_id] = []
-        
-        return results
\ No newline at end of file
+                ): product_id
+                for product_id, hero_path in hero_images.items()
+            }
+            
+            for future in as_completed(futures):
+                product_id = futures[future]
+                try:
+                    results[product_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to create variations for {product_id}: {e}")
+                    results[product_id] = []
+        
+        # Report in input order regardless of completion order
+        return {product_id: results[product_id] for product_id in hero_images}
@@ -58,19 +58,10 @@ class ImageGenerator:
         logger.info(f"  Prompt: {prompt[:100]}...")
         logger.info(f"  Size: {image_size}")
         
-        # Get dimensions for the requested format
-        width, height = AspectRatios.get_generation_size(image_size)
-        flux_format = AspectRatios.get_flux_format(image_size)
-        
         try:
             image_url = self.provider.generate_image(
-                prompt=prompt,
-                negative_prompt=negative_prompt,
-                width=width,
-                height=height,
-                image_size=flux_format,  # Flux-specific format string
-                num_inference_steps=num_inference_steps,
-                guidance_scale=guidance_scale
+                **self._build_request(prompt, image_size, num_inference_steps,
+                                      guidance_scale, negative_prompt)
             )
             
             logger.info(f"✓ Image generated")
@@ -81,11 +72,72 @@ class ImageGenerator:
             logger.error(f"Failed to generate image: {e}")
             raise
     
+    async def generate_async(
+        self, 
+        prompt: str, 
+        image_size: str = "landscape_16_9",
+        num_inference_steps: int = 28,
+        guidance_scale: float = 3.5,
+        negative_prompt: str = None
+    ) -> str:
+        """
+        Generate an image using the configured provider's async interface.
+        
+        Accepts the same arguments as generate().
+        
+        Returns:
+            URL of generated image
+        """
+        logger.info(f"Generating image (async)...")
+        logger.info(f"  Prompt: {prompt[:100]}...")
+        logger.info(f"  Size: {image_size}")
+        
+        try:
+            image_url = await self.provider.generate_image_async(
+                **self._build_request(prompt, image_size, num_inference_steps,
+                                      guidance_scale, negative_prompt)
+            )
+            
+            logger.info(f"✓ Image generated")
+            logger.info(f"  URL: {image_url[:50]}...")
+            return image_url
+            
+        except Exception as e:
+            logger.error(f"Failed to generate image: {e}")
+            raise
+    
+    def _build_request(
+        self,
+        prompt: str,
+        image_size: str,
+        num_inference_steps: int,
+        guidance_scale: float,
+        negative_prompt: str
+    ) -> dict:
+        """Build provider keyword arguments for a generation request."""
+        # Get dimensions for the requested format
+        width, height = AspectRatios.get_generation_size(image_size)
+        flux_format = AspectRatios.get_flux_format(image_size)
+        
+        return {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "width": width,
+            "height": height,
+            "image_size": flux_format,  # Flux-specific format string
+            "num_inference_steps": num_inference_steps,
+            "guidance_scale": guidance_scale
+        }
+    
     # Convenience aliases for backwards compatibility
     def generate_with_flux(self, *args, **kwargs) -> str:
         """Alias for generate() for backwards compatibility."""
         return self.generate(*args, **kwargs)
     
+    async def generate_with_flux_async(self, *args, **kwargs) -> str:
+        """Alias for generate_async() mirroring generate_with_flux()."""
+        return await self.generate_async(*args, **kwargs)
+    
     def generate_square_image(self, prompt: str) -> str:
         """Generate a square image (optimized for social media)."""
         return self.generate(prompt, image_size="1x1")
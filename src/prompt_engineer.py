@@ -4,14 +4,22 @@ Prompt Engineer Module
 Uses LLM providers to generate optimized image generation prompts from campaign briefs.
 """
 
+import asyncio
 import os
-from typing import Dict
+from typing import Dict, List
 import logging
+from src.constants import Defaults
+from src.utils import json_loads
 from src.providers import OpenAIProvider, LLMProvider
 
 logger = logging.getLogger(__name__)
 
 
+def _estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~3 characters per token)."""
+    return len(text) // 3 + 1
+
+
 class PromptEngineer:
     """Generates optimized image prompts using configurable LLM providers."""
     
@@ -53,7 +61,7 @@ class PromptEngineer:
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=0.7,
-                max_tokens=300
+                max_tokens=Defaults.PROMPT_MAX_TOKENS
             )
             
             # Log the generated prompt (truncated for readability)
@@ -68,9 +76,227 @@ class PromptEngineer:
             logger.warning(f"Using fallback prompt: {fallback[:100]}...")
             return fallback
     
-    def _build_system_prompt(self) -> str:
-        """Build the system prompt for GPT-4."""
-        return """You are an expert creative director specializing in product photography 
+    async def create_image_prompt_async(self, campaign_brief: Dict, product: Dict) -> str:
+        """
+        Generate an image prompt without blocking the event loop.
+        
+        Accepts the same arguments as create_image_prompt().
+        
+        Returns:
+            Optimized prompt string for image generation
+        """
+        logger.info(f"Generating prompt for product: {product.get('name', product.get('id'))}")
+        
+        try:
+            system_prompt = self._build_system_prompt()
+            user_prompt = self._build_user_prompt(campaign_brief, product)
+            
+            prompt = await self.provider.generate_prompt_async(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=0.7,
+                max_tokens=Defaults.PROMPT_MAX_TOKENS
+            )
+            
+            logger.info(f"Generated prompt: {prompt[:100]}...")
+            
+            return prompt
+            
+        except Exception as e:
+            logger.error(f"Failed to generate prompt: {e}")
+            fallback = self._create_fallback_prompt(product)
+            logger.warning(f"Using fallback prompt: {fallback[:100]}...")
+            return fallback
+    
+    def create_image_prompts_batch(self, campaign_brief: Dict, products: List[Dict]) -> Dict[str, str]:
+        """
+        Generate image prompts for several products in as few LLM calls as possible.
+
+        Products are enumerated in one request and the model is asked to
+        answer with a JSON object, so N products cost one round trip instead of N.
+        Lists too large for the model's context or completion limit are split
+        by plan_prompt_batches() and the batches are sent concurrently.
+        Products missing from (or malformed in) a response get a fallback prompt.
+
+        Args:
+            campaign_brief: Full campaign brief dictionary
+            products: List of product dictionaries
+
+        Returns:
+            Dictionary mapping product IDs to prompts
+        """
+        if not products:
+            return {}
+
+        batches = self.plan_prompt_batches(campaign_brief, products)
+        logger.info(f"Generating prompts for {len(products)} products in {len(batches)} batch(es)")
+
+        prompts = {}
+        try:
+            system_prompt = self._build_system_prompt(batch=True)
+            requests = [
+                {
+                    "system_prompt": system_prompt,
+                    "user_prompt": self._build_batch_user_prompt(campaign_brief, batch),
+                    "temperature": 0.7,
+                    "max_tokens": Defaults.PROMPT_MAX_TOKENS * len(batch)
+                }
+                for batch in batches
+            ]
+
+            if len(requests) == 1:
+                responses = [self.provider.generate_prompt(**requests[0])]
+            else:
+                # Failed batches come back as None and fall back per product
+                responses = asyncio.run(self.provider.generate_prompts_concurrent(requests))
+
+            for response in responses:
+                if response:
+                    prompts.update(self._parse_batch_response(response))
+
+        except Exception as e:
+            logger.error(f"Failed to generate batch prompts: {e}")
+
+        return self._with_fallbacks(products, prompts)
+
+    def plan_prompt_batches(self, campaign_brief: Dict, products: List[Dict]) -> List[List[Dict]]:
+        """
+        Split products into groups that each fit one batched LLM request.
+
+        A group's estimated input tokens plus its completion budget
+        (PROMPT_MAX_TOKENS per product) must fit the model's context window,
+        and the completion budget must stay under PROMPT_BATCH_MAX_OUTPUT_TOKENS.
+
+        Args:
+            campaign_brief: Full campaign brief dictionary
+            products: List of product dictionaries
+
+        Returns:
+            Product groups in input order (one LLM call each)
+        """
+        context_tokens = self._context_tokens()
+        max_per_batch = max(1, Defaults.PROMPT_BATCH_MAX_OUTPUT_TOKENS // Defaults.PROMPT_MAX_TOKENS)
+        base_tokens = (
+            _estimate_tokens(self._build_system_prompt(batch=True))
+            + _estimate_tokens(self._build_batch_user_prompt(campaign_brief, []))
+        )
+
+        batches = []
+        batch = []
+        used = base_tokens
+        for product in products:
+            cost = _estimate_tokens(self._format_product_line(product)) + Defaults.PROMPT_MAX_TOKENS
+            if batch and (len(batch) >= max_per_batch or used + cost > context_tokens):
+                batches.append(batch)
+                batch = []
+                used = base_tokens
+            batch.append(product)
+            used += cost
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def _context_tokens(self) -> int:
+        """Context window of the provider's model (longest matching prefix)."""
+        model = getattr(self.provider, 'model', '') or ''
+        matches = [name for name in Defaults.MODEL_CONTEXT_TOKENS if model.startswith(name)]
+        if not matches:
+            return Defaults.DEFAULT_CONTEXT_TOKENS
+        return Defaults.MODEL_CONTEXT_TOKENS[max(matches, key=len)]
+
+    def create_image_prompts_batch_api(self, campaign_brief: Dict, products: List[Dict]) -> Dict[str, str]:
+        """
+        Generate one image prompt per product through the provider's Batch API.
+
+        Batch API requests are billed at about half price but are queued, so
+        this blocks until the whole batch completes - use it for
+        non-interactive runs. Providers without a Batch API fall back to
+        create_image_prompts_batch().
+
+        Args:
+            campaign_brief: Full campaign brief dictionary
+            products: List of product dictionaries
+
+        Returns:
+            Dictionary mapping product IDs to prompts
+        """
+        if not products:
+            return {}
+
+        if not hasattr(self.provider, 'generate_prompts_batch'):
+            logger.warning(f"{self.provider.get_provider_name()} has no Batch API - using a single batched call")
+            return self.create_image_prompts_batch(campaign_brief, products)
+
+        logger.info(f"Submitting {len(products)} prompt requests to the Batch API")
+
+        prompts = {}
+        try:
+            system_prompt = self._build_system_prompt()
+            responses = self.provider.generate_prompts_batch([
+                {
+                    "system_prompt": system_prompt,
+                    "user_prompt": self._build_user_prompt(campaign_brief, product),
+                    "temperature": 0.7,
+                    "max_tokens": Defaults.PROMPT_MAX_TOKENS
+                }
+                for product in products
+            ])
+            prompts = {
+                product.get('id', 'unknown'): response
+                for product, response in zip(products, responses)
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to generate prompts via Batch API: {e}")
+
+        return self._with_fallbacks(products, prompts)
+
+    def _with_fallbacks(self, products: List[Dict], prompts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Map every product to its generated prompt, or a fallback prompt.
+
+        Args:
+            products: List of product dictionaries
+            prompts: Generated prompts by product ID (may be incomplete)
+
+        Returns:
+            Dictionary mapping product IDs to prompts
+        """
+        results = {}
+        for product in products:
+            product_id = product.get('id', 'unknown')
+            prompt = prompts.get(product_id)
+            if prompt:
+                logger.info(f"Generated prompt for {product_id}: {prompt[:100]}...")
+                results[product_id] = prompt
+            else:
+                fallback = self._create_fallback_prompt(product)
+                logger.warning(f"Using fallback prompt for {product_id}: {fallback[:100]}...")
+                results[product_id] = fallback
+
+        return results
+
+    def _build_system_prompt(self, batch: bool = False) -> str:
+        """
+        Build the system prompt for GPT-4.
+        
+        Args:
+            batch: Ask for the JSON object of a multi-product request instead
+                of a single bare prompt
+            
+        Returns:
+            System prompt string
+        """
+        if batch:
+            output_instruction = (
+                "Output ONLY the JSON object requested by the user - one prompt per product, "
+                "no explanations, no preamble, no markdown."
+            )
+        else:
+            output_instruction = "Output ONLY the image generation prompt - no explanations, no preamble."
+        
+        return f"""You are an expert creative director specializing in product photography 
 and social media advertising. Your specialty is creating detailed image generation prompts 
 that produce professional, commercial-quality product visuals.
 
@@ -89,7 +315,7 @@ CRITICAL COMPOSITION REQUIREMENTS:
 - Use "centered", "middle of frame", "centrally placed" in your prompts
 - This ensures the image crops well to different aspect ratios
 
-Output ONLY the image generation prompt - no explanations, no preamble."""
+{output_instruction}"""
     
     def _build_user_prompt(self, campaign_brief: Dict, product: Dict) -> str:
         """
@@ -108,27 +334,107 @@ Output ONLY the image generation prompt - no explanations, no preamble."""
         target_audience = campaign_brief.get('target_audience', '')
         region = campaign_brief.get('region', '')
         
-        # Build context-rich prompt
+        # Static instructions first and per-product details last, so repeated
+        # calls share the longest possible prefix for server-side prompt caching
         prompt = f"""Create a detailed image generation prompt for professional product photography.
 
-Product: {product_name}
-Description: {product_desc}
-Campaign Theme: {campaign_message}
-Target Audience: {target_audience}
-Region/Market: {region}
-
 Generate a prompt that will create a hero product image suitable for social media advertising. 
 The image should be photorealistic, professionally lit, and styled appropriately for the target 
-audience. Include relevant lifestyle context or setting that resonates with {target_audience}.
+audience. Include relevant lifestyle context or setting that resonates with the target audience.
 
 IMPORTANT: Use CENTER-FOCUSED composition. Keep all products and important elements in the 
 center of the frame (not on edges). This image will be cropped to multiple aspect ratios 
 (square, portrait, landscape), so centered composition is critical.
 
-Output only the final image prompt."""
+Output only the final image prompt.
+
+Campaign Theme: {campaign_message}
+Target Audience: {target_audience}
+Region/Market: {region}
+
+Product: {product_name}
+Description: {product_desc}"""
         
         return prompt
     
+    def _build_batch_user_prompt(self, campaign_brief: Dict, products: List[Dict]) -> str:
+        """
+        Build a single user prompt covering multiple products.
+
+        Args:
+            campaign_brief: Full campaign brief
+            products: List of product details
+
+        Returns:
+            Formatted user prompt string requesting a JSON response
+        """
+        campaign_message = campaign_brief.get('campaign_message', '')
+        target_audience = campaign_brief.get('target_audience', '')
+        region = campaign_brief.get('region', '')
+
+        product_lines = "\n".join(self._format_product_line(p) for p in products)
+
+        prompt = f"""Create one detailed image generation prompt for professional product photography
+for EACH of the products below.
+
+Each prompt should create a hero product image suitable for social media advertising.
+The images should be photorealistic, professionally lit, and styled appropriately for the target
+audience. Include relevant lifestyle context or setting that resonates with the target audience.
+
+IMPORTANT: Use CENTER-FOCUSED composition. Keep all products and important elements in the
+center of the frame (not on edges). These images will be cropped to multiple aspect ratios
+(square, portrait, landscape), so centered composition is critical.
+
+Respond with ONLY a JSON object in exactly this format (one entry per product id):
+{{"prompts": [{{"id": "<product id>", "prompt": "<image prompt>"}}]}}
+
+Campaign Theme: {campaign_message}
+Target Audience: {target_audience}
+Region/Market: {region}
+
+Products:
+{product_lines}"""
+
+        return prompt
+
+    def _format_product_line(self, product: Dict) -> str:
+        """Format one product's entry in a batch user prompt."""
+        return (
+            f"- id: {product.get('id', 'unknown')}\n"
+            f"  Product: {product.get('name', 'Product')}\n"
+            f"  Description: {product.get('description', '')}"
+        )
+
+    def _parse_batch_response(self, response: str) -> Dict[str, str]:
+        """
+        Parse the JSON response of a batch prompt request.
+
+        Args:
+            response: Raw LLM response text
+
+        Returns:
+            Dictionary mapping product IDs to prompts (empty if unparseable)
+        """
+        # Tolerate surrounding prose or markdown fences around the JSON object
+        start = response.find('{')
+        end = response.rfind('}')
+        if start == -1 or end == -1:
+            logger.warning("Batch prompt response did not contain JSON")
+            return {}
+
+        try:
+            data = json_loads(response[start:end + 1])
+        except ValueError as e:
+            logger.warning(f"Could not parse batch prompt response: {e}")
+            return {}
+
+        prompts = {}
+        for entry in data.get('prompts', []):
+            if isinstance(entry, dict) and entry.get('id') and entry.get('prompt'):
+                prompts[str(entry['id'])] = str(entry['prompt']).strip()
+
+        return prompts
+
     def _create_fallback_prompt(self, product: Dict) -> str:
         """
         Create a basic fallback prompt if API fails.
@@ -150,23 +456,57 @@ commercial advertising style, clean white background, sharp focus, detailed, pho
         """
         Generate prompts for multiple products.
         
+        Synchronous wrapper around batch_create_prompts_async(); must not be
+        called from a running event loop.
+        
         Args:
             campaign_brief: Campaign brief dictionary
             products: List of product dictionaries
             
+        Returns:
+            Dictionary mapping product IDs to prompts
+        """
+        return asyncio.run(self.batch_create_prompts_async(campaign_brief, products))
+    
+    async def batch_create_prompts_async(
+        self,
+        campaign_brief: Dict,
+        products: list,
+        max_concurrency: int = Defaults.MAX_CONCURRENT_PROMPTS
+    ) -> Dict[str, str]:
+        """
+        Generate prompts for multiple products with concurrent LLM calls.
+        
+        One request per product, at most max_concurrency in flight, so total
+        latency is close to a single round trip instead of one per product.
+        
+        Args:
+            campaign_brief: Campaign brief dictionary
+            products: List of product dictionaries
+            max_concurrency: Maximum number of in-flight LLM calls
+            
         Returns:
             Dictionary mapping product IDs to prompts
         """
         logger.info(f"Batch generating prompts for {len(products)} products")
         
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def create(product):
+            async with semaphore:
+                return await self.create_image_prompt_async(campaign_brief, product)
+        
+        results = await asyncio.gather(
+            *(create(product) for product in products),
+            return_exceptions=True
+        )
+        
         prompts = {}
-        for product in products:
+        for product, result in zip(products, results):
             product_id = product.get('id', 'unknown')
-            try:
-                prompt = self.create_image_prompt(campaign_brief, product)
-                prompts[product_id] = prompt
-            except Exception as e:
-                logger.error(f"Failed to generate prompt for {product_id}: {e}")
-                prompts[product_id] = self._create_fallback_prompt(product)
-        
-        return prompts
\ No newline at end of file
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to generate prompt for {product_id}: {result}")
+                result = self._create_fallback_prompt(product)
+            prompts[product_id] = result
+        
+        return prompts
@@ -33,13 +33,17 @@ Example:
             return "Anthropic"
 """
 
-from .base import LLMProvider, ImageProvider
+from .base import LLMProvider, CachedLLMProvider, ImageProvider
+from .cache import ResponseCache, SemanticLLMCache
 from .openai_provider import OpenAIProvider
 from .flux_provider import FluxProvider
 
 __all__ = [
     'LLMProvider',
+    'CachedLLMProvider',
     'ImageProvider',
+    'ResponseCache',
+    'SemanticLLMCache',
     'OpenAIProvider',
     'FluxProvider'
 ]
\ No newline at end of file
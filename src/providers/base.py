@@ -6,8 +6,12 @@ This allows easy swapping of AI services without changing core logic.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, List, Optional
+import asyncio
+import functools
 import logging
+from src.constants import Defaults, Paths
+from .cache import ResponseCache, SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +42,12 @@ class LLMProvider(ABC):
         """
         Generate a prompt using the LLM.
         
+        Callers should keep content shared across calls (instructions, brand
+        and campaign context) at the start of the system and user prompts and
+        put per-call details last: providers with server-side prompt caching
+        (e.g. OpenAI, for identical prefixes of 1024+ tokens) bill and serve
+        a repeated prefix faster.
+        
         Args:
             system_prompt: System instructions
             user_prompt: User request
@@ -49,12 +59,224 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def generate_prompt_async(
+        self, 
+        system_prompt: str, 
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300
+    ) -> str:
+        """
+        Generate a prompt without blocking the event loop.
+        
+        Providers with a native async client should override this. The default
+        runs generate_prompt() in the loop's default thread pool.
+        
+        Returns:
+            Generated prompt string
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.generate_prompt,
+                system_prompt,
+                user_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        )
+    
+    async def generate_prompts_concurrent(
+        self,
+        requests: List[Dict],
+        max_concurrency: int = Defaults.MAX_CONCURRENT_PROMPTS
+    ) -> List[Optional[str]]:
+        """
+        Generate several prompts concurrently.
+        
+        At most max_concurrency calls are in flight, so total latency is
+        close to that of the slowest call rather than the sum of all calls.
+        
+        Args:
+            requests: Keyword arguments for generate_prompt_async(), one dict per call
+            max_concurrency: Maximum number of in-flight calls
+            
+        Returns:
+            Generated prompts in request order (None for calls that failed)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate(request):
+            async with semaphore:
+                return await self.generate_prompt_async(**request)
+        
+        results = await asyncio.gather(
+            *(generate(request) for request in requests),
+            return_exceptions=True
+        )
+        
+        prompts = []
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.error(f"Prompt request {i} failed: {result}")
+                result = None
+            prompts.append(result)
+        return prompts
+    
     @abstractmethod
     def get_provider_name(self) -> str:
         """Return the provider name (e.g., 'OpenAI', 'Anthropic')."""
         pass
 
 
+class CachedLLMProvider(LLMProvider):
+    """
+    LLMProvider that answers repeated low-temperature requests from a cache.
+    
+    Subclasses implement _generate_prompt_uncached() (and optionally
+    _generate_prompt_uncached_async()) instead of generate_prompt(). Requests
+    above cache_max_temperature are sampled, so they always go to the API.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        cache: Optional[ResponseCache] = None,
+        cache_max_temperature: float = Defaults.LLM_CACHE_MAX_TEMPERATURE
+    ):
+        """
+        Initialize cached LLM provider.
+        
+        Args:
+            api_key: API key for the service
+            model: Model identifier
+            cache: Response cache (defaults to a disk cache under Paths.LLM_CACHE)
+            cache_max_temperature: Highest temperature whose responses are cached
+        """
+        super().__init__(api_key, model)
+        if cache is None:
+            cache = ResponseCache(Paths.LLM_CACHE, ttl_seconds=Defaults.LLM_CACHE_TTL_SECONDS)
+        self.cache = cache
+        self.cache_max_temperature = cache_max_temperature
+        self.stats = {"hits": 0, "misses": 0}
+        self._single_flight = SingleFlight()
+    
+    def generate_prompt(
+        self, 
+        system_prompt: str, 
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300
+    ) -> str:
+        """Generate a prompt, serving repeated deterministic requests from the cache."""
+        key = self._cache_key(system_prompt, user_prompt, temperature, max_tokens)
+        if key is not None:
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                return cached
+        
+        prompt = self._generate_prompt_uncached(
+            system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens
+        )
+        if key is not None:
+            self.cache.set(key, prompt)
+        return prompt
+    
+    async def generate_prompt_async(
+        self, 
+        system_prompt: str, 
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300
+    ) -> str:
+        """
+        Async variant of generate_prompt() sharing the same cache.
+        
+        Concurrent identical cacheable requests are coalesced into one call.
+        """
+        key = self._cache_key(system_prompt, user_prompt, temperature, max_tokens)
+        if key is None:
+            return await self._generate_prompt_uncached_async(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens
+            )
+        
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached
+        
+        async def generate():
+            prompt = await self._generate_prompt_uncached_async(
+                system_prompt, user_prompt, temperature=temperature, max_tokens=max_tokens
+            )
+            self.cache.set(key, prompt)
+            return prompt
+        
+        return await self._single_flight.run(key, generate)
+    
+    @abstractmethod
+    def _generate_prompt_uncached(
+        self, 
+        system_prompt: str, 
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300
+    ) -> str:
+        """Call the LLM API. Same arguments as generate_prompt()."""
+        pass
+    
+    async def _generate_prompt_uncached_async(
+        self, 
+        system_prompt: str, 
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300
+    ) -> str:
+        """Call the LLM API without blocking; defaults to the thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self._generate_prompt_uncached,
+                system_prompt,
+                user_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        )
+    
+    def _cache_key(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Cache key for a request, or None if the request is not cacheable."""
+        if temperature > self.cache_max_temperature:
+            return None
+        return ResponseCache.make_key({
+            "provider": self.get_provider_name(),
+            "model": self.model,
+            "system": system_prompt,
+            "user": user_prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+    
+    def _cache_lookup(self, key: str) -> Optional[str]:
+        """Look up a cached response and update hit/miss counters."""
+        cached = self.cache.get(key)
+        if cached is None:
+            self.stats["misses"] += 1
+            return None
+        
+        self.stats["hits"] += 1
+        logger.debug(f"💾 LLM cache hit ({key[:12]})")
+        return cached
+
+
 class ImageProvider(ABC):
     """Abstract base class for Image generation providers (Flux, DALL-E, Stable Diffusion, etc.)."""
     
@@ -94,6 +316,36 @@ class ImageProvider(ABC):
         """
         pass
     
+    async def generate_image_async(
+        self,
+        prompt: str,
+        negative_prompt: Optional[str] = None,
+        width: int = 1024,
+        height: int = 1024,
+        **kwargs
+    ) -> str:
+        """
+        Generate an image without blocking the event loop.
+        
+        Providers with a native async client should override this. The default
+        runs generate_image() in the loop's default thread pool.
+        
+        Returns:
+            URL of generated image
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.generate_image,
+                prompt,
+                negative_prompt=negative_prompt,
+                width=width,
+                height=height,
+                **kwargs
+            )
+        )
+    
     @abstractmethod
     def get_provider_name(self) -> str:
         """Return the provider name (e.g., 'Flux', 'DALL-E')."""
@@ -0,0 +1,324 @@
+"""
+Response Caches
+
+ResponseCache: two-level (memory + disk) cache for provider responses, keyed
+by a hash of the request, so identical calls within and across runs skip the
+network.
+
+SemanticLLMCache: embedding-similarity cache that also answers paraphrases of
+earlier requests.
+
+SingleFlight: coalesces concurrent identical async calls that would otherwise
+all miss the cache at once.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from src.constants import Defaults, Paths
+from src.utils import json_dumps, json_loads
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    LRU cache in memory backed by one JSON file per entry on disk.
+    
+    Entries older than the TTL are treated as missing. Disk errors are logged
+    and ignored - the cache never fails a request.
+    """
+    
+    def __init__(self, cache_dir: str, ttl_seconds: float = 86400, max_memory_entries: int = 256):
+        """
+        Initialize ResponseCache.
+        
+        Args:
+            cache_dir: Directory for cache files (created on first write)
+            ttl_seconds: Age after which an entry expires
+            max_memory_entries: Entries kept in the in-memory LRU
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(fields: Dict[str, Any]) -> str:
+        """
+        Build a cache key from request fields.
+        
+        Args:
+            fields: JSON-serializable request fields
+            
+        Returns:
+            SHA-256 hex digest of the fields' canonical JSON
+        """
+        canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value.
+        
+        Args:
+            key: Cache key from make_key()
+            
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._read(key)
+            if entry is None:
+                return None
+        
+        created, value = entry
+        if time.time() - created > self.ttl_seconds:
+            self._memory.pop(key, None)
+            return None
+        
+        self._remember(key, entry)
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in memory and on disk.
+        
+        Args:
+            key: Cache key from make_key()
+            value: JSON-serializable value
+        """
+        entry = (time.time(), value)
+        self._remember(key, entry)
+        
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(json_dumps({"created": entry[0], "value": value}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key[:12]}: {e}")
+    
+    def _remember(self, key: str, entry: tuple) -> None:
+        """Insert or refresh an entry in the in-memory LRU."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _read(self, key: str) -> Optional[tuple]:
+        """Read an entry from disk, or None if absent or unreadable."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = json_loads(f.read())
+            return data["created"], data["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key[:12]}: {e}")
+            return None
+    
+    def _path(self, key: str) -> Path:
+        """File holding an entry (fanned out by key prefix)."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+
+class SemanticLLMCache:
+    """
+    Nearest-neighbour cache over prompt embeddings.
+    
+    Embeddings are kept L2-normalized in one matrix, so a lookup is a single
+    matrix-vector product. Each entry also records a context key (model,
+    system prompt, ...) and only entries with the same context can match.
+    Within a context only the prompt embedding is compared, so templated
+    prompts that differ in a few words (e.g. a product name) can still match.
+    NumPy is imported on first use, since the cache is opt-in.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str = Paths.SEMANTIC_CACHE,
+        threshold: float = Defaults.SEMANTIC_CACHE_THRESHOLD
+    ):
+        """
+        Initialize SemanticLLMCache, loading any entries saved in cache_dir.
+        
+        Args:
+            cache_dir: Directory holding embeddings.npy and entries.json
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.cache_dir = Path(cache_dir)
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._embeddings: "Optional[np.ndarray]" = None
+        self._entries: List[Dict[str, str]] = []
+        self._load()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def lookup(self, context: str, embedding: Sequence[float]) -> Optional[str]:
+        """
+        Find the response of the most similar cached prompt.
+        
+        Args:
+            context: Context key the match must share (see ResponseCache.make_key)
+            embedding: Embedding of the new prompt
+            
+        Returns:
+            Cached response, or None if no entry reaches the threshold
+        """
+        import numpy as np
+
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._embeddings is None or self._embeddings.shape[1] != query.shape[0]:
+                return None
+            sims = self._embeddings @ query
+            entries = self._entries
+        
+        contexts = [entry["context"] for entry in entries[:len(sims)]]
+        mask = np.fromiter((c == context for c in contexts), dtype=bool, count=len(contexts))
+        if not mask.any():
+            return None
+        sims[~mask] = -1.0
+        
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        
+        logger.debug(f"💾 Semantic cache hit (similarity {sims[best]:.3f})")
+        return entries[best]["response"]
+    
+    def add(self, context: str, embedding: Sequence[float], response: str) -> None:
+        """
+        Add a prompt embedding and its response, and persist the cache.
+        
+        Args:
+            context: Context key of the request
+            embedding: Embedding of the prompt
+            response: LLM response to reuse for similar prompts
+        """
+        import numpy as np
+
+        row = self._normalize(embedding)[np.newaxis, :]
+        with self._lock:
+            if self._embeddings is None or self._embeddings.shape[1] != row.shape[1]:
+                # First entry, or the embedding model changed - start over
+                self._embeddings = row
+                self._entries = []
+            else:
+                self._embeddings = np.vstack([self._embeddings, row])
+            self._entries.append({"context": context, "response": response})
+            self._save()
+    
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> "np.ndarray":
+        """Return the embedding as a unit-length float32 vector."""
+        import numpy as np
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _load(self) -> None:
+        """Load saved entries, ignoring a missing or inconsistent cache."""
+        import numpy as np
+
+        try:
+            embeddings = np.load(self.cache_dir / "embeddings.npy")
+            with open(self.cache_dir / "entries.json", 'rb') as f:
+                entries = json_loads(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable semantic cache: {e}")
+            return
+        
+        if embeddings.ndim != 2 or len(embeddings) != len(entries):
+            logger.warning("Ignoring inconsistent semantic cache")
+            return
+        
+        self._embeddings = embeddings.astype(np.float32, copy=False)
+        self._entries = entries
+        logger.debug(f"Loaded {len(entries)} semantic cache entries")
+    
+    def _save(self) -> None:
+        """Write the cache atomically; called with the lock held."""
+        import numpy as np
+
+        pid = os.getpid()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_embeddings = self.cache_dir / f"embeddings.{pid}.tmp.npy"
+            tmp_entries = self.cache_dir / f"entries.{pid}.tmp"
+            np.save(tmp_embeddings, self._embeddings)
+            with open(tmp_entries, 'wb') as f:
+                f.write(json_dumps(self._entries))
+            os.replace(tmp_embeddings, self.cache_dir / "embeddings.npy")
+            os.replace(tmp_entries, self.cache_dir / "entries.json")
+        except OSError as e:
+            logger.warning(f"Could not write semantic cache: {e}")
+
+
+class SingleFlight:
+    """
+    Share one in-flight async call between concurrent callers with the same key.
+    
+    The first caller runs the call; callers arriving before it finishes await
+    its result (or exception) instead of issuing a duplicate request.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run call() unless a call with the same key is already in flight.
+        
+        Args:
+            key: Request key (e.g. from ResponseCache.make_key)
+            call: Zero-argument coroutine function performing the request
+            
+        Returns:
+            Result of the (possibly shared) call
+        """
+        loop = asyncio.get_running_loop()
+        future = self._inflight.get(key)
+        if future is not None and future.get_loop() is loop:
+            logger.debug(f"Joining in-flight request ({key[:12]})")
+            # Shield so a cancelled follower doesn't cancel the shared call
+            return await asyncio.shield(future)
+        
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved - there may be no followers
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -4,29 +4,58 @@ Flux Image Provider
 Wrapper for Flux Pro 1.1 via fal.ai
 """
 
+import asyncio
 import logging
 import os
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 import fal_client
+from src.constants import Defaults, Paths
 from .base import ImageProvider
+from .cache import ResponseCache, SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
+def _image_size_for(width: int, height: int) -> str:
+    """
+    Map pixel dimensions to a Flux size preset.
+    
+    Anything wider than 3:2 is landscape, anything taller than 7:10 is
+    portrait, the rest is square. Comparing cross-products keeps the
+    thresholds exact (a 3:2 image stays square) without float division.
+    """
+    if 2 * width > 3 * height:
+        return "landscape_16_9"
+    if 10 * width < 7 * height:
+        return "portrait_16_9"
+    return "square"
+
+
 class FluxProvider(ImageProvider):
     """Flux Pro 1.1 provider via fal.ai."""
     
-    def __init__(self, api_key: str, model: str = "fal-ai/flux-pro/v1.1"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "fal-ai/flux-pro/v1.1",
+        cache: Optional[ResponseCache] = None
+    ):
         """
         Initialize Flux provider.
         
         Args:
             api_key: fal.ai API key
             model: Model identifier
+            cache: Cache of image URLs by request (defaults to a disk cache
+                under Paths.FLUX_CACHE)
         """
         super().__init__(api_key, model)
         os.environ["FAL_KEY"] = api_key
+        if cache is None:
+            cache = ResponseCache(Paths.FLUX_CACHE, ttl_seconds=Defaults.FLUX_CACHE_TTL_SECONDS)
+        self.cache = cache
+        self._single_flight = SingleFlight()
     
     def generate_image(
         self,
@@ -48,64 +77,227 @@ class FluxProvider(ImageProvider):
                 - image_size: Flux size preset (overrides width/height)
                 - num_inference_steps: Quality steps (default 28)
                 - guidance_scale: Prompt adherence (default 3.5)
+                - seed: Fixed seed for reproducible generations
             
         Returns:
             URL of generated image
         """
-        # Get image_size from kwargs (should always be provided now)
-        image_size = kwargs.get('image_size')
-        if not image_size:
-            # Fallback: determine from dimensions
-            aspect_ratio = width / height
-            if 0.9 <= aspect_ratio <= 1.1:
-                image_size = "square"
-            elif aspect_ratio > 1.5:
-                image_size = "landscape_16_9"
-            elif aspect_ratio < 0.7:
-                image_size = "portrait_16_9"
-            else:
-                image_size = "square"
+        arguments = self._build_arguments(prompt, negative_prompt, width, height, **kwargs)
+        key = self._cache_key(arguments)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"💾 Reusing cached Flux image for identical request ({key[:12]})")
+            return cached
         
-        # Use default negative prompt if not provided
-        if negative_prompt is None:
-            from src.constants import Defaults
-            negative_prompt = Defaults.DEFAULT_NEGATIVE_PROMPT
+        try:
+            start_time = time.time()
+            logger.info(f"Generating with Flux Pro: {arguments['image_size']}")
+            
+            result = fal_client.subscribe(self.model, arguments=arguments)
+            
+            image_url = self._extract_image_url(result, time.time() - start_time)
+            self.cache.set(key, image_url)
+            return image_url
         
-        # Flux-specific parameters
-        num_inference_steps = kwargs.get('num_inference_steps', 28)
-        guidance_scale = kwargs.get('guidance_scale', 3.5)
+        except Exception as e:
+            logger.error(f"Flux API error: {e}")
+            raise
+    
+    async def generate_image_async(
+        self,
+        prompt: str,
+        negative_prompt: Optional[str] = None,
+        width: int = 1920,
+        height: int = 1080,
+        **kwargs
+    ) -> str:
+        """
+        Generate image using Flux Pro without blocking the event loop.
+        
+        Accepts the same arguments as generate_image(). Concurrent identical
+        requests share one generation.
+        
+        Returns:
+            URL of generated image
+        """
+        arguments = self._build_arguments(prompt, negative_prompt, width, height, **kwargs)
+        key = self._cache_key(arguments)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"💾 Reusing cached Flux image for identical request ({key[:12]})")
+            return cached
         
+        return await self._single_flight.run(key, lambda: self._generate_uncached_async(arguments, key))
+    
+    async def _generate_uncached_async(self, arguments: Dict, key: str) -> str:
+        """Run a Flux generation through fal's queue and cache the image URL."""
         try:
             start_time = time.time()
-            logger.info(f"Generating with Flux Pro: {image_size}")
+            logger.info(f"Generating with Flux Pro (async): {arguments['image_size']}")
+            
+            # Queue the request and poll for it, so many generations can be
+            # in flight on fal's side at once
+            handle = await fal_client.submit_async(self.model, arguments=arguments)
+            logger.debug(f"Flux request queued: {handle.request_id}")
+            result = await handle.get()
+            
+            image_url = self._extract_image_url(result, time.time() - start_time)
+            self.cache.set(key, image_url)
+            return image_url
+        
+        except Exception as e:
+            logger.error(f"Flux API error: {e}")
+            raise
+    
+    async def generate_images_concurrent(
+        self,
+        prompts: List[str],
+        max_in_flight: int = Defaults.MAX_CONCURRENT_IMAGES,
+        **kwargs
+    ) -> List[Optional[str]]:
+        """
+        Generate one image per prompt with several fal.ai requests in flight.
+        
+        Duplicate prompts are generated once and share the resulting URL.
+        
+        Args:
+            prompts: Image generation prompts
+            max_in_flight: Maximum number of queued/running requests
+            **kwargs: Arguments passed to generate_image_async() for every prompt
             
-            result = fal_client.subscribe(
-                self.model,
-                arguments={
-                    "prompt": prompt,
-                    "negative_prompt": negative_prompt,
-                    "image_size": image_size,
-                    "num_inference_steps": num_inference_steps,
-                    "guidance_scale": guidance_scale,
-                    "num_images": 1,
-                    "safety_tolerance": "2",
-                    "enable_safety_checker": True
-                }
-            )
+        Returns:
+            Image URLs in prompt order (None for generations that failed)
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
+        
+        async def generate(prompt):
+            async with semaphore:
+                return await self.generate_image_async(prompt, **kwargs)
+        
+        unique_prompts = list(dict.fromkeys(prompts))
+        if len(unique_prompts) < len(prompts):
+            logger.info(f"Deduplicated {len(prompts)} Flux requests to {len(unique_prompts)}")
+        
+        results = await asyncio.gather(
+            *(generate(prompt) for prompt in unique_prompts),
+            return_exceptions=True
+        )
+        
+        urls_by_prompt = {}
+        for i, (prompt, result) in enumerate(zip(unique_prompts, results)):
+            if isinstance(result, BaseException):
+                logger.error(f"Flux generation {i} failed: {result}")
+                result = None
+            urls_by_prompt[prompt] = result
+        return [urls_by_prompt[prompt] for prompt in prompts]
+    
+    async def submit_image_async(
+        self,
+        prompt: str,
+        webhook_url: str,
+        negative_prompt: Optional[str] = None,
+        width: int = 1920,
+        height: int = 1080,
+        **kwargs
+    ) -> str:
+        """
+        Queue a generation whose result fal.ai will POST to a webhook.
+        
+        Returns as soon as the request is queued. The request ID identifies
+        the webhook delivery; fetch_image_async() retrieves the result later.
+        
+        Args:
+            prompt: Image generation prompt
+            webhook_url: URL fal.ai calls when the generation completes
+            negative_prompt: Things to avoid
+            width: Image width (used to determine aspect ratio)
+            height: Image height (used to determine aspect ratio)
+            **kwargs: Additional Flux-specific parameters (see generate_image())
             
-            generation_time = time.time() - start_time
+        Returns:
+            fal.ai request ID
+        """
+        arguments = self._build_arguments(prompt, negative_prompt, width, height, **kwargs)
+        
+        try:
+            handle = await fal_client.submit_async(self.model, arguments=arguments, webhook_url=webhook_url)
+            logger.info(f"Flux request queued with webhook: {handle.request_id}")
+            return handle.request_id
+        
+        except Exception as e:
+            logger.error(f"Flux API error: {e}")
+            raise
+    
+    async def fetch_image_async(self, request_id: str) -> str:
+        """
+        Fetch the image URL of a previously queued request.
+        
+        Args:
+            request_id: fal.ai request ID from submit_image_async()
             
-            if result and 'images' in result and len(result['images']) > 0:
-                image_url = result['images'][0]['url']
-                logger.info(f"✓ Image generated in {generation_time:.2f}s")
-                return image_url
-            else:
-                raise ValueError("No image returned from Flux API")
+        Returns:
+            URL of generated image
+        """
+        try:
+            start_time = time.time()
+            result = await fal_client.result_async(self.model, request_id)
+            return self._extract_image_url(result, time.time() - start_time)
         
         except Exception as e:
             logger.error(f"Flux API error: {e}")
             raise
     
+    def _build_arguments(
+        self,
+        prompt: str,
+        negative_prompt: Optional[str],
+        width: int,
+        height: int,
+        **kwargs
+    ) -> Dict:
+        """Build the fal.ai request arguments for a generation call."""
+        # Get image_size from kwargs (should always be provided now)
+        image_size = kwargs.get('image_size')
+        if not image_size:
+            # Fallback: determine from dimensions
+            image_size = _image_size_for(width, height)
+        
+        # Use default negative prompt if not provided
+        if negative_prompt is None:
+            negative_prompt = Defaults.DEFAULT_NEGATIVE_PROMPT
+        
+        # Flux-specific parameters
+        num_inference_steps = kwargs.get('num_inference_steps', Defaults.DEFAULT_INFERENCE_STEPS)
+        guidance_scale = kwargs.get('guidance_scale', Defaults.DEFAULT_GUIDANCE_SCALE)
+        
+        arguments = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "image_size": image_size,
+            "num_inference_steps": num_inference_steps,
+            "guidance_scale": guidance_scale,
+            "num_images": 1,
+            "safety_tolerance": "2",
+            "enable_safety_checker": True
+        }
+        if kwargs.get('seed') is not None:
+            arguments["seed"] = kwargs['seed']
+        
+        return arguments
+    
+    def _cache_key(self, arguments: Dict) -> str:
+        """Cache key for a generation request."""
+        return ResponseCache.make_key({"model": self.model, "arguments": arguments})
+    
+    def _extract_image_url(self, result: Dict, generation_time: float) -> str:
+        """Pull the image URL out of a fal.ai response."""
+        if result and 'images' in result and len(result['images']) > 0:
+            image_url = result['images'][0]['url']
+            logger.info(f"✓ Image generated in {generation_time:.2f}s")
+            return image_url
+        else:
+            raise ValueError("No image returned from Flux API")
+    
     def get_provider_name(self) -> str:
         return "Flux Pro"
     
@@ -4,28 +4,65 @@ OpenAI LLM Provider
 Wrapper for OpenAI API (GPT-4, GPT-4-turbo, etc.)
 """
 
+import asyncio
 import logging
-from openai import OpenAI
-from .base import LLMProvider
+import time
+from typing import Dict, List, Optional
+from openai import (
+    DEFAULT_CONNECTION_LIMITS,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+    Timeout
+)
+from src.constants import Defaults
+from src.utils import HTTP2_AVAILABLE, json_dumps, json_loads
+from .base import CachedLLMProvider
+from .cache import ResponseCache, SemanticLLMCache
 
 logger = logging.getLogger(__name__)
 
 
-class OpenAIProvider(LLMProvider):
+class OpenAIProvider(CachedLLMProvider):
     """OpenAI GPT provider."""
     
-    def __init__(self, api_key: str, model: str = "gpt-4"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4",
+        cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticLLMCache] = None
+    ):
         """
         Initialize OpenAI provider.
         
         Args:
             api_key: OpenAI API key
             model: Model name (gpt-4, gpt-4-turbo, gpt-3.5-turbo)
+            cache: Response cache for low-temperature calls (defaults to disk cache)
+            semantic_cache: Optional embedding cache that also answers paraphrased
+                low-temperature requests (costs one embedding call per miss).
+                Only the user prompt is compared, so per-product prompts built
+                from one template can match each other and return another
+                product's response; enable it only where such near-duplicate
+                prompts really are interchangeable
         """
-        super().__init__(api_key, model)
-        self.client = OpenAI(api_key=api_key)
+        super().__init__(api_key, model, cache=cache)
+        self.client = OpenAI(
+            api_key=api_key,
+            max_retries=Defaults.OPENAI_MAX_RETRIES,
+            http_client=DefaultHttpxClient(**self._http_client_options())
+        )
+        self.semantic_cache = semantic_cache
+        self.stats["semantic_hits"] = 0
+        
+        # Async client is created on first use; its connection pool belongs
+        # to the event loop it was created on
+        self._async_client = None
+        self._async_loop = None
     
-    def generate_prompt(
+    def _generate_prompt_uncached(
         self,
         system_prompt: str,
         user_prompt: str,
@@ -33,25 +70,241 @@ class OpenAIProvider(LLMProvider):
         max_tokens: int = 300
     ) -> str:
         """Generate prompt using OpenAI API."""
+        context = self._semantic_context(system_prompt, temperature, max_tokens)
+        embedding = None
+        if context is not None:
+            embedding = self._embed(user_prompt)
+            cached = self._semantic_lookup(context, embedding)
+            if cached is not None:
+                return cached
+        
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
+                **self._build_request(system_prompt, user_prompt, temperature, max_tokens)
             )
             
             prompt = response.choices[0].message.content.strip()
             logger.debug(f"OpenAI generated prompt: {prompt[:100]}...")
+            if embedding is not None:
+                self.semantic_cache.add(context, embedding, prompt)
             return prompt
             
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
     
+    async def _generate_prompt_uncached_async(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 300
+    ) -> str:
+        """Generate prompt using the async OpenAI client."""
+        context = self._semantic_context(system_prompt, temperature, max_tokens)
+        embedding = None
+        if context is not None:
+            embedding = await self._embed_async(user_prompt)
+            cached = self._semantic_lookup(context, embedding)
+            if cached is not None:
+                return cached
+        
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                **self._build_request(system_prompt, user_prompt, temperature, max_tokens)
+            )
+            
+            prompt = response.choices[0].message.content.strip()
+            logger.debug(f"OpenAI generated prompt (async): {prompt[:100]}...")
+            if embedding is not None:
+                self.semantic_cache.add(context, embedding, prompt)
+            return prompt
+            
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+    
+    def generate_prompts_batch(
+        self,
+        requests: List[Dict],
+        poll_interval: float = Defaults.BATCH_POLL_INTERVAL_SECONDS,
+        timeout: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate several prompts through the OpenAI Batch API.
+        
+        Batch requests cost about half as much as regular calls but are queued,
+        so this is meant for non-interactive runs: it blocks until the batch
+        finishes (up to the 24h completion window).
+        
+        Args:
+            requests: Dicts with system_prompt and user_prompt, and optionally
+                temperature and max_tokens
+            poll_interval: Seconds between batch status checks
+            timeout: Give up (and cancel the batch) after this many seconds
+            
+        Returns:
+            Generated prompts in request order (None for requests that failed)
+        """
+        if not requests:
+            return []
+        
+        lines = []
+        for i, request in enumerate(requests):
+            body = self._build_request(
+                request["system_prompt"],
+                request["user_prompt"],
+                request.get("temperature", 0.7),
+                request.get("max_tokens", 300)
+            )
+            lines.append(json_dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }))
+        
+        try:
+            input_file = self.client.files.create(
+                file=("prompts.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window=Defaults.BATCH_COMPLETION_WINDOW
+            )
+            logger.info(f"📦 Submitted OpenAI batch {batch.id} with {len(requests)} requests")
+            
+            started = time.monotonic()
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                if timeout is not None and time.monotonic() - started > timeout:
+                    self.client.batches.cancel(batch.id)
+                    raise TimeoutError(f"OpenAI batch {batch.id} did not finish within {timeout}s")
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+            
+            logger.info(f"OpenAI batch {batch.id} finished with status: {batch.status}")
+            
+            results: List[Optional[str]] = [None] * len(requests)
+            if batch.output_file_id:
+                # Expired batches can still carry results for finished requests
+                output = self.client.files.content(batch.output_file_id).content
+                for line in output.splitlines():
+                    if not line.strip():
+                        continue
+                    result = json_loads(line)
+                    response = result.get("response") or {}
+                    if response.get("status_code") != 200:
+                        logger.warning(f"Batch request {result.get('custom_id')} failed: {result.get('error')}")
+                        continue
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    results[int(result["custom_id"])] = content.strip()
+            
+            failed = sum(result is None for result in results)
+            if failed:
+                logger.warning(f"⚠️  {failed}/{len(requests)} batch requests returned no prompt")
+            return results
+            
+        except Exception as e:
+            logger.error(f"OpenAI Batch API error: {e}")
+            raise
+    
+    def _semantic_context(
+        self,
+        system_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Context key for semantic caching, or None if the request is not eligible."""
+        if self.semantic_cache is None or temperature > Defaults.SEMANTIC_CACHE_MAX_TEMPERATURE:
+            return None
+        return ResponseCache.make_key({
+            "model": self.model,
+            "system": system_prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+    
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed text for the semantic cache; None if the embedding call fails."""
+        try:
+            response = self.client.embeddings.create(model=Defaults.EMBEDDING_MODEL, input=text)
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic cache: {e}")
+            return None
+    
+    async def _embed_async(self, text: str) -> Optional[List[float]]:
+        """Async variant of _embed()."""
+        try:
+            response = await self._get_async_client().embeddings.create(
+                model=Defaults.EMBEDDING_MODEL, input=text
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning(f"Embedding failed, skipping semantic cache: {e}")
+            return None
+    
+    def _semantic_lookup(self, context: str, embedding: Optional[List[float]]) -> Optional[str]:
+        """Look up a semantically similar cached response and count hits."""
+        if embedding is None:
+            return None
+        cached = self.semantic_cache.lookup(context, embedding)
+        if cached is not None:
+            self.stats["semantic_hits"] += 1
+        return cached
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """Return the async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=Defaults.OPENAI_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(**self._http_client_options())
+            )
+            self._async_loop = loop
+        return self._async_client
+    
+    @staticmethod
+    def _http_client_options() -> dict:
+        """
+        Connection settings shared by the sync and async HTTP clients.
+        
+        Connections stay pooled between calls, so a campaign's requests reuse
+        TCP/TLS sessions; HTTP/2 multiplexes them when h2 is installed.
+        """
+        # Limits/Timeout come from the SDK so they match the HTTP library it uses
+        limits_type = type(DEFAULT_CONNECTION_LIMITS)
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "limits": limits_type(
+                max_connections=Defaults.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=Defaults.OPENAI_MAX_CONNECTIONS // 2,
+                keepalive_expiry=Defaults.OPENAI_KEEPALIVE_SECONDS
+            ),
+            "timeout": Timeout(Defaults.OPENAI_TIMEOUT_SECONDS, connect=5.0)
+        }
+    
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> dict:
+        """Build chat completion arguments for a prompt request."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+    
     def get_provider_name(self) -> str:
         return "OpenAI"
     
@@ -2,45 +2,254 @@
 Utility functions for the Creative Automation Pipeline.
 """
 
+import importlib.util
 import json
 import logging
+import os
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterator, List, Union
 from datetime import datetime
+from src.constants import APICosts
+
+try:
+    import orjson
+except ImportError:  # Optional speedup - fall back to the stdlib json module
+    orjson = None
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); without it HTTP clients
+# fall back to pooled HTTP/1.1 keep-alive connections
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Creative files written by CreativeComposer (PNG by default, WebP optional)
+OUTPUT_IMAGE_SUFFIXES = (".png", ".webp")
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON, using orjson when available.
+    
+    Args:
+        data: JSON document (str or UTF-8 encoded bytes)
+        
+    Returns:
+        Parsed Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes, using orjson when available.
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+        
+    Returns:
+        UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode("utf-8")
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize the types orjson handles natively (NumPy values, datetimes)."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL
+}
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders each second's timestamp once, not per record."""
+    
+    def __init__(self, fmt: str, datefmt: str):
+        super().__init__(fmt=fmt, datefmt=datefmt)
+        self._cached_time = (None, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if second != cached_second:
+            formatted = time.strftime(datefmt or self.datefmt, self.converter(record.created))
+            # Single tuple assignment keeps the cache consistent across threads
+            self._cached_time = (second, formatted)
+        return formatted
 
 
 def setup_logging(log_level: str = "INFO") -> None:
     """
     Set up logging configuration.
     
+    Like logging.basicConfig, this only configures the root logger if it
+    has no handlers yet, so repeated calls are cheap no-ops.
+    
     Args:
-        log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
+        log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL;
+            case-insensitive - anything else raises ValueError)
     """
-    logging.basicConfig(
-        level=getattr(logging, log_level),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level = _LOG_LEVELS.get(log_level.upper())
+    if level is None:
+        raise ValueError(f"Invalid log level: {log_level!r} (expected one of {', '.join(_LOG_LEVELS)})")
+    
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    
+    handler = logging.StreamHandler()
+    handler.setFormatter(_CachedTimeFormatter(
+        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+@dataclass(frozen=True)
+class CampaignBriefView:
+    """Read-only view of the campaign brief fields used by the pipeline."""
+    
+    __slots__ = (
+        "campaign_id", "campaign_name", "products",
+        "campaign_message", "brand_config", "aspect_ratios"
     )
+    
+    campaign_id: str
+    campaign_name: str
+    products: List[Dict[str, Any]]
+    campaign_message: str
+    brand_config: Dict[str, Any]
+    aspect_ratios: List[str]
+    
+    @classmethod
+    def from_brief(cls, brief: Dict[str, Any]) -> "CampaignBriefView":
+        """
+        Extract pipeline fields (with defaults) from a campaign brief.
+        
+        Args:
+            brief: Campaign brief dictionary
+            
+        Returns:
+            CampaignBriefView instance
+        """
+        campaign_id = brief.get("campaign_id", "campaign")
+        return cls(
+            campaign_id=campaign_id,
+            campaign_name=brief.get("campaign_name", campaign_id),
+            products=brief.get("products", []),
+            campaign_message=brief.get("campaign_message", ""),
+            brand_config=brief.get("brand_config", {}),
+            aspect_ratios=brief.get("aspect_ratios", ["1x1", "9x16", "16x9"])
+        )
+
+
+@lru_cache(maxsize=32)
+def _load_campaign_brief_cached(brief_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a campaign brief; cached per (path, mtime) by lru_cache."""
+    with open(brief_path, 'rb') as f:
+        return json_loads(f.read())
 
 
 def load_campaign_brief(brief_path: Path) -> Dict[str, Any]:
     """
     Load campaign brief from JSON file.
     
+    Parsed briefs are cached by path and modification time, so re-loading an
+    unchanged brief skips JSON parsing. The returned dictionary is shared
+    between callers and should be treated as read-only.
+    
     Args:
         brief_path: Path to JSON campaign brief
         
     Returns:
         Campaign brief dictionary
     """
-    with open(brief_path, 'r') as f:
-        return json.load(f)
+    brief_path = Path(brief_path).resolve()
+    return _load_campaign_brief_cached(str(brief_path), brief_path.stat().st_mtime_ns)
+
+
+class BoundedBatcher:
+    """
+    Accumulate items and hand them to a flush callback in bounded batches.
+    
+    A batch is flushed when it reaches max_batch items, or when an item is
+    added more than max_wait_ms after the first item of the pending batch -
+    large enough batches to amortize per-call overhead without holding early
+    items back indefinitely. Call flush() (or use as a context manager) to
+    drain the remainder.
+    """
+    
+    def __init__(self, flush_fn: Callable[[List[Any]], None],
+                 max_batch: int = 16, max_wait_ms: float = 500):
+        """
+        Initialize BoundedBatcher.
+        
+        Args:
+            flush_fn: Callback receiving each batch as a list
+            max_batch: Maximum items per batch
+            max_wait_ms: Maximum age of a pending batch before it is flushed
+        """
+        self.flush_fn = flush_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._items: List[Any] = []
+        self._first_enqueue = 0.0
+    
+    def add(self, item: Any) -> None:
+        """Add an item, flushing if the batch is full or has waited too long."""
+        if not self._items:
+            self._first_enqueue = time.monotonic()
+        self._items.append(item)
+        
+        if (len(self._items) >= self.max_batch
+                or time.monotonic() - self._first_enqueue >= self.max_wait):
+            self.flush()
+    
+    def extend(self, items: List[Any]) -> None:
+        """Add several items in order."""
+        for item in items:
+            self.add(item)
+    
+    def flush(self) -> None:
+        """Flush any pending items."""
+        if self._items:
+            batch, self._items = self._items, []
+            self.flush_fn(batch)
+    
+    def __enter__(self) -> "BoundedBatcher":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
 
 
 def create_output_structure(campaign_id: str, products: list) -> Path:
     """
     Create organized output folder structure.
     
+    Existing product folders are found with one directory scan, so re-runs
+    skip their mkdir calls.
+    
     Args:
         campaign_id: Campaign identifier
         products: List of products
@@ -51,8 +260,11 @@ def create_output_structure(campaign_id: str, products: list) -> Path:
     base_path = Path("outputs") / campaign_id
     base_path.mkdir(parents=True, exist_ok=True)
     
-    for product in products:
-        product_path = base_path / product["id"]
+    with os.scandir(base_path) as entries:
+        existing = {entry.name for entry in entries if entry.is_dir()}
+    missing = [base_path / product["id"] for product in products if product["id"] not in existing]
+    
+    for product_path in missing:
         product_path.mkdir(exist_ok=True)
     
     return base_path
@@ -74,28 +286,42 @@ def log_summary(summary: Dict[str, Any]) -> None:
     logger.info("=" * 60)
 
 
-def list_output_files(output_path: Path) -> List[Dict[str, str]]:
+def iter_output_files(output_path: Path) -> Iterator[Dict[str, str]]:
     """
-    List all generated output files.
+    Yield information about each generated output file.
+    
+    Walks the tree with os.scandir, whose entries already know their type,
+    so each file costs a single stat() call for its size.
     
     Args:
         output_path: Path to output directory
         
-    Returns:
-        List of file information dictionaries
+    Yields:
+        File information dictionaries
     """
-    files = []
-    
-    for file_path in output_path.rglob("*.png"):
-        rel_path = file_path.relative_to(output_path)
-        files.append({
-            "path": str(rel_path),
-            "size_kb": round(file_path.stat().st_size / 1024, 2),
-            "product": rel_path.parts[0] if len(rel_path.parts) > 1 else "unknown",
-            "variant": file_path.stem
-        })
+    root = str(output_path)
+    stack = [root]
     
-    return files
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(OUTPUT_IMAGE_SUFFIXES):
+                    yield _output_file_info(root, entry, entry.stat().st_size)
+
+
+def _output_file_info(root: str, entry: os.DirEntry, size: int) -> Dict[str, str]:
+    """Build the report record for an output file."""
+    rel_path = os.path.relpath(entry.path, root)
+    parts = rel_path.split(os.sep)
+    return {
+        "path": rel_path,
+        "size_kb": round(size / 1024, 2),
+        "product": parts[0] if len(parts) > 1 else "unknown",
+        "variant": os.path.splitext(entry.name)[0]
+    }
 
 
 def generate_execution_report(summary: Dict[str, Any], 
@@ -134,28 +360,52 @@ def generate_execution_report(summary: Dict[str, Any],
             "openai_calls": summary.get("GPT-4 Calls", 0),
             "flux_calls": summary.get("Flux Calls", 0),
             "estimated_cost_usd": summary.get("Estimated Cost", 0.0)
-        },
-        "outputs": {
-            "location": str(output_path),
-            "files": list_output_files(output_path)
         }
     }
     
-    # Add compliance reports if available
-    if compliance_reports:
-        report["compliance"] = {
-            "checks_performed": len(compliance_reports),
-            "reports": compliance_reports
-        }
-    
-    # Save report
+    # Save report. The output file list is streamed entry by entry, so memory
+    # use doesn't grow with the number of files; the layout matches
+    # json_dumps(report, indent=True) of the complete report.
     report_path = output_path / "execution_report.json"
-    with open(report_path, 'w') as f:
-        json.dump(report, f, indent=2)
+    with open(report_path, 'wb') as f:
+        f.write(json_dumps(report, indent=True)[:-2])  # Drop the closing "\n}"
+        f.write(b',\n  "outputs": {\n    "location": ')
+        f.write(json_dumps(str(output_path)))
+        f.write(b',\n    "files": [')
+        
+        separator = b"\n      "
+        for file_info in iter_output_files(output_path):
+            f.write(separator)
+            f.write(_indent_json(json_dumps(file_info, indent=True), 6))
+            separator = b",\n      "
+        f.write(b"]" if separator == b"\n      " else b"\n    ]")
+        f.write(b"\n  }")
+        
+        # Add compliance reports if available
+        if compliance_reports:
+            compliance = {
+                "checks_performed": len(compliance_reports),
+                "reports": compliance_reports
+            }
+            f.write(b',\n  "compliance": ')
+            f.write(_indent_json(json_dumps(compliance, indent=True), 2))
+        
+        f.write(b"\n}")
     
     return report_path
 
 
+def _indent_json(data: bytes, spaces: int) -> bytes:
+    """Indent every line after the first of a pretty-printed JSON value."""
+    return data.replace(b"\n", b"\n" + b" " * spaces)
+
+
+# Rough estimates (actual costs may vary): ~1000 tokens per GPT-4 call and
+# fal.ai Flux Pro pricing per image
+_GPT4_COST_PER_CALL_MICRODOLLARS = round(APICosts.OPENAI_GPT4_PER_1K_TOKENS * 1_000_000)
+_FLUX_COST_PER_IMAGE_MICRODOLLARS = round(APICosts.FLUX_PRO_PER_IMAGE * 1_000_000)
+
+
 def calculate_estimated_cost(gpt4_calls: int, flux_calls: int) -> float:
     """
     Calculate estimated API costs.
@@ -167,9 +417,11 @@ def calculate_estimated_cost(gpt4_calls: int, flux_calls: int) -> float:
     Returns:
         Estimated cost in USD
     """
-    # Rough estimates (actual costs may vary)
-    GPT4_COST_PER_CALL = 0.01  # ~1000 tokens at $0.01/1k
-    FLUX_COST_PER_IMAGE = 0.055  # fal.ai Flux Pro pricing
-    
-    total = (gpt4_calls * GPT4_COST_PER_CALL) + (flux_calls * FLUX_COST_PER_IMAGE)
-    return round(total, 2)
\ No newline at end of file
+    # Integer micro-dollars keep the sum exact however many calls are made;
+    # the total is rounded half-up to whole cents
+    total_microdollars = (
+        gpt4_calls * _GPT4_COST_PER_CALL_MICRODOLLARS
+        + flux_calls * _FLUX_COST_PER_IMAGE_MICRODOLLARS
+    )
+    cents = (total_microdollars + 5_000) // 10_000
+    return cents / 100